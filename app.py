@@ -3,12 +3,32 @@ import pandas as pd
 import plotly.express as px
 from core.database import NovelDB
 from core.scraper import NovelpiaScraper
-from core.mappings import translate_tags, TAG_MAP
+from core.scanner import ScanEngine
+from core.mappings import translate_tag_counts
 
 # --- SETUP ---
 st.set_page_config(page_title="Sleeper Scout 2026", layout="wide")
-db = NovelDB()
-scraper = NovelpiaScraper(db)
+
+@st.cache_resource
+def get_db():
+    return NovelDB()
+
+@st.cache_resource
+def get_scraper():
+    # One pooled HTTP client shared across reruns and sessions
+    return NovelpiaScraper(get_db())
+
+db = get_db()
+scraper = get_scraper()
+
+# `version` is only a cache key: the DB bumps it whenever valid_novels changes
+@st.cache_data(max_entries=64)
+def load_vault_page(version, plus_only, adult_only, page_size, page):
+    return pd.DataFrame(db.query_vault(plus_only, adult_only, "ratio", limit=page_size, offset=page * page_size))
+
+@st.cache_data(max_entries=16)
+def count_vault(version, plus_only, adult_only):
+    return db.count_vault(plus_only, adult_only)
 
 # --- SIDEBAR: MISSION CONTROL ---
 with st.sidebar:
@@ -19,19 +39,26 @@ with st.sidebar:
     col_s, col_e = st.columns(2)
     start_id = col_s.number_input("Start ID", value=383000)
     end_id = col_e.number_input("End ID", value=383100)
+    col_c, col_r = st.columns(2)
+    concurrency = col_c.number_input("Concurrency", value=16, min_value=1, max_value=128)
+    rate_limit = col_r.number_input("Req/sec", value=8.0, min_value=0.5, step=0.5)
     
     if st.button("🚀 Launch Scout Mission", use_container_width=True):
         progress_bar = st.progress(0)
         status_text = st.empty()
-        total_tasks = int(end_id - start_id + 1)
-        
-        for i, nid in enumerate(range(int(start_id), int(end_id) + 1)):
-            status_text.text(f"Scanning Target: {nid}...")
-            result = scraper.scrape_novel(str(nid))
-            progress_bar.progress((i + 1) / total_tasks)
-            if "2FA" in result:
-                st.error("Security Wall Detected. Mission Aborted.")
-                break
+
+        def report(done, total, nid, result):
+            status_text.text(f"Scanned Target: {nid} -> {result}")
+            progress_bar.progress(done / total)
+
+        engine = ScanEngine(scraper, concurrency=int(concurrency), rate_limit=float(rate_limit))
+        results = engine.run(
+            range(int(start_id), int(end_id) + 1),
+            on_progress=report,
+            stop_on=lambda result: "2FA" in result,
+        )
+        if any("2FA" in r for r in results.values()):
+            st.error("Security Wall Detected. Mission Aborted.")
         st.success("Recon mission completed.")
 
     st.divider()
@@ -57,21 +84,18 @@ tab_vault, tab_tags, tab_surgical = st.tabs([
 
 # --- TAB 1: THE VAULT ---
 with tab_vault:
-    conn = db.get_connection()
-    df = pd.read_sql("SELECT * FROM valid_novels", conn)
-    
+    # Filtered, sorted by ratio and paged in SQL, same queries as main.py
+    version = db.get_data_version()
+    total_rows = count_vault(version, f_plus, f_19)
+    c1, c2 = st.columns([1, 1])
+    page_size = c1.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+    n_pages = max(1, -(-total_rows // page_size))
+    page = c2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+    df = load_vault_page(version, f_plus, f_19, page_size, int(page))
+
     if not df.empty:
-        # Apply Translation Mapping
-        df['tags_en'] = df['tags'].apply(translate_tags)
-        
-        # Filtering Logic
-        if f_plus:
-            df = df[df['is_plus'] == 1]
-        if f_19:
-            df = df[df['is_19'] == 1]
-            
         st.dataframe(
-            df.sort_values(by="ratio", ascending=False),
+            df,
             column_config={
                 "url": st.column_config.LinkColumn("Access"),
                 "ratio": st.column_config.NumberColumn("Sleeper Ratio", format="%.2f ⭐"),
@@ -94,13 +118,8 @@ with tab_tags:
     tag_counts = db.get_tag_stats()
     
     if tag_counts:
-        # Map Korean tag counts to English equivalents
-        translated_counts = {}
-        for tag, count in tag_counts.items():
-            en_tag = TAG_MAP.get(tag, tag)
-            translated_counts[en_tag] = translated_counts.get(en_tag, 0) + count
-            
-        tag_df = pd.DataFrame(translated_counts.items(), columns=['Tag', 'Frequency']).sort_values('Frequency', ascending=False)
+        # Map Korean tag counts to English equivalents (synonyms summed)
+        tag_df = translate_tag_counts(tag_counts).rename(columns={'Freq': 'Frequency'})
         
         c1, c2 = st.columns([3, 2])
         with c1:
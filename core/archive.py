@@ -0,0 +1,234 @@
+"""
+Streaming import/export between JSON archives and the SQLite vault.
+
+    python -m core.archive import data/metadata.json --skipped data/skipped_ids.json
+    python -m core.archive export vault.parquet
+
+Both directions work in fixed-size batches, so archive size doesn't affect memory.
+"""
+import argparse
+import csv
+import json
+import sys
+from datetime import datetime
+from pathlib import Path
+
+from core.database import NovelDB
+
+_SKIP = " \t\r\n,﻿"
+EXPORT_TABLES = ("valid_novels", "blacklist")
+# Characters that can continue a JSON number (1 -> 1.5, 1.5 -> 1.5e3)
+_NUMBER_TAIL = frozenset("0123456789+-.eE")
+
+
+def iter_json(path, chunk_size=1 << 16):
+    """
+    Yields the elements of a top-level JSON array (or the values of a JSON-lines
+    file) one at a time, decoding incrementally with raw_decode so only the
+    current chunk is held in memory. An empty or whitespace-only file yields nothing.
+    """
+    decoder = json.JSONDecoder()
+    with open(path, encoding="utf-8") as f:
+        buf, pos, eof, started = "", 0, False, False
+
+        def fill():
+            more = f.read(chunk_size)
+            return buf[pos:] + more, 0, not more
+
+        while True:
+            while pos < len(buf) and buf[pos] in _SKIP:
+                pos += 1
+            if pos == len(buf):
+                if eof:
+                    return
+                buf, pos, eof = fill()
+                continue
+            if buf[pos] == "[" and not started:
+                started = True  # top-level array: stream its elements
+                pos += 1
+                continue
+            started = True
+            if buf[pos] == "]":
+                pos += 1
+                continue
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                buf, pos, eof = fill()  # element spans the chunk boundary
+                continue
+            if not eof and (end == len(buf) or (
+                    isinstance(value, (int, float)) and not isinstance(value, bool)
+                    and all(c in _NUMBER_TAIL for c in buf[end:]))):
+                # A number cut at the chunk end ("1." or "-5.5e") may continue in the next chunk
+                buf, pos, eof = fill()
+                continue
+            pos = end
+            yield value
+
+
+def _batched(items, size):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def legacy_novel_row(rec):
+    """metadata.json record (id, writer, chapters, views, tags_kr, ...) -> valid_novels row, or None."""
+    nid = rec.get("id") or rec.get("")
+    if not nid:
+        return None
+    tags = rec.get("tags_kr") or ""
+    if isinstance(tags, list):
+        tags = ",".join(tags)
+    return {
+        'id': int(nid),
+        'title': rec.get("title") or f"Novel_{nid}",
+        'author': rec.get("writer"),
+        'ep': rec.get("chapters"),
+        'views': rec.get("views"),
+        'tags': tags,
+        'is_19': int(bool(rec.get("is_19"))),
+        'is_plus': int(bool(rec.get("is_plus"))),
+        'url': rec.get("url") or f"https://novelpia.com/novel/{nid}",
+        'date': rec.get("scraped_at"),
+    }
+
+
+def import_archive(db, path, batch_size=1000):
+    """Streams a legacy metadata archive into valid_novels. Returns {read, imported, skipped}."""
+    stats = {"read": 0, "imported": 0, "skipped": 0}
+
+    def rows():
+        for rec in iter_json(path):
+            stats["read"] += 1
+            row = legacy_novel_row(rec) if isinstance(rec, dict) else None
+            if row is None:
+                stats["skipped"] += 1
+                continue
+            yield row
+
+    for batch in _batched(rows(), batch_size):
+        stats["imported"] += db.import_legacy_novels(batch)
+    return stats
+
+
+def import_skip_list(db, path, reason="LOW_SIGNAL", batch_size=5000):
+    """
+    Streams a skip list (bare IDs or {"id"/"novel_id", "reason"} objects) into the
+    blacklist. Defaults to LOW_SIGNAL so old skips get re-probed under today's rules.
+    """
+    now = datetime.now()
+    stats = {"read": 0, "imported": 0}
+
+    def rows():
+        for item in iter_json(path):
+            stats["read"] += 1
+            if isinstance(item, dict):
+                nid, why = item.get("id") or item.get("novel_id"), item.get("reason") or reason
+            else:
+                nid, why = item, reason
+            if str(nid).strip().isdigit():
+                yield (int(nid), why, now)
+
+    for batch in _batched(rows(), batch_size):
+        stats["imported"] += db.import_blacklist(batch)
+    return stats
+
+
+def _parquet_type(pa, decl):
+    decl = (decl or "").upper()
+    if "INT" in decl:
+        return pa.int64()
+    if "REAL" in decl:
+        return pa.float64()
+    return pa.string()
+
+
+def export_vault(db, path, fmt=None, table="valid_novels", batch_size=5000):
+    """
+    Streams a table to JSONL, CSV or Parquet (format from the suffix unless given).
+    Parquet needs pyarrow and is written one row group per batch. Returns rows written.
+    """
+    if table not in EXPORT_TABLES:
+        raise ValueError(f"Unknown table: {table}")
+    fmt = (fmt or Path(path).suffix.lstrip(".")).lower()
+    cursor = db.get_connection().execute(f"SELECT * FROM {table} ORDER BY novel_id")
+    cols = [c[0] for c in cursor.description]
+    batches = iter(lambda: cursor.fetchmany(batch_size), [])
+    written = 0
+
+    if fmt == "jsonl":
+        with open(path, "w", encoding="utf-8") as f:
+            for batch in batches:
+                f.writelines(json.dumps(dict(zip(cols, row)), ensure_ascii=False, default=str) + "\n"
+                             for row in batch)
+                written += len(batch)
+    elif fmt == "csv":
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            out = csv.writer(f)
+            out.writerow(cols)
+            for batch in batches:
+                out.writerows(batch)
+                written += len(batch)
+    elif fmt == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise RuntimeError("Parquet export needs pyarrow (pip install pyarrow)")
+        decls = {row[1]: row[2] for row in db.get_connection().execute(f"PRAGMA table_info({table})")}
+        schema = pa.schema([(c, _parquet_type(pa, decls.get(c))) for c in cols])
+        with pq.ParquetWriter(path, schema) as out:
+            for batch in batches:
+                columns = [[None if v is None else (str(v) if t == pa.string() else v) for v in col]
+                           for col, t in zip(zip(*batch), schema.types)]
+                out.write_table(pa.Table.from_arrays(columns, schema=schema))
+                written += len(batch)
+    else:
+        raise ValueError(f"Unknown export format: {fmt} (use jsonl, csv or parquet)")
+    return written
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Import legacy JSON archives / export the vault")
+    ap.add_argument("--db", default="npia_scout.db")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    imp = sub.add_parser("import", help="metadata archive (JSON array or JSONL) -> vault")
+    imp.add_argument("path", nargs="?")
+    imp.add_argument("--skipped", help="skip list -> blacklist")
+    imp.add_argument("--reason", default="LOW_SIGNAL", help="blacklist reason for bare skipped IDs")
+    imp.add_argument("--batch-size", type=int, default=1000)
+    exp = sub.add_parser("export", help="vault -> .jsonl / .csv / .parquet")
+    exp.add_argument("path")
+    exp.add_argument("--format", choices=["jsonl", "csv", "parquet"])
+    exp.add_argument("--table", choices=EXPORT_TABLES, default="valid_novels")
+    args = ap.parse_args(argv)
+
+    db = NovelDB(args.db)
+    try:
+        report = {}
+        if args.cmd == "import":
+            if args.path:
+                report["novels"] = import_archive(db, args.path, args.batch_size)
+            if args.skipped:
+                report["blacklist"] = import_skip_list(db, args.skipped, args.reason)
+        else:
+            report["exported"] = export_vault(db, args.path, args.format, args.table)
+        print(json.dumps(report, ensure_ascii=False))
+    except (OSError, ValueError, RuntimeError) as e:
+        print(f"Archive Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
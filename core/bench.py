@@ -0,0 +1,180 @@
+"""
+Offline scan benchmark: serves the recorded pages in data/fixtures from a local
+stand-in for novelpia.com and drives ScanEngine / NovelDB against it.
+
+    python -m core.bench --ids 2000 --concurrency 32 --latency 80 --jitter 40 --error-rate 0.01
+"""
+import argparse
+import json
+import random
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from core.database import NovelDB
+from core.extract import extract_page, legacy_extract_page
+from core.scanner import ScanEngine
+from core.scraper import NovelpiaScraper
+
+FIXTURES = Path(__file__).resolve().parent.parent / "data" / "fixtures"
+
+# (status, fixture) cycled by novel ID; None serves an empty 404
+CORPUS = [
+    (200, "valid.html"),
+    (404, None),
+    (200, "low_signal.html"),
+    (200, "adult_19.html"),
+    (200, "plus.html"),
+    (200, "adult_tag_only.html"),
+    (200, "removed.html"),
+]
+
+
+class MockNovelpiaServer:
+    """Threaded local HTTP server answering /novel/<id> from the fixture corpus."""
+
+    def __init__(self, latency=0.05, jitter=0.02, error_rate=0.0, fixtures=FIXTURES, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.pages = {name: (fixtures / name).read_bytes() for _, name in CORPUS if name}
+        self.rng = random.Random(seed)
+        self.requests = 0
+        self._server = None
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                mock.requests += 1
+                delay = max(mock.latency + mock.rng.uniform(-mock.jitter, mock.jitter), 0)
+                time.sleep(delay)
+                if mock.rng.random() < mock.error_rate:
+                    return self._reply(503, b"")
+                try:
+                    nid = int(self.path.rstrip("/").rsplit("/", 1)[-1])
+                except ValueError:
+                    return self._reply(404, b"")
+                status, name = CORPUS[nid % len(CORPUS)]
+                self._reply(status, mock.pages[name] if name else b"")
+
+            def _reply(self, status, body):
+                self.send_response(status)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self._server.server_port}/novel/"
+
+    def start(self):
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def bench_parse(rounds=200):
+    """Average ms per page for the fast and legacy extractors over the fixture corpus."""
+    pages = [(FIXTURES / name).read_text(encoding="utf-8") for _, name in CORPUS if name]
+    out = {}
+    for label, fn in (("fast", extract_page), ("legacy", legacy_extract_page)):
+        t0 = time.perf_counter()
+        for _ in range(rounds):
+            for page in pages:
+                fn(page)
+        out[f"{label}_ms_per_page"] = round(1000 * (time.perf_counter() - t0) / (rounds * len(pages)), 3)
+    return out
+
+
+def bench_db_writes(db, rows=5000, batch_size=200):
+    """Raw NovelDB.save_novels throughput in rows/sec, outside of any scan."""
+    now = datetime.now()
+    records = [{
+        'id': 10_000_000 + i, 'title': f"bench {i}", 'author': "NPIA Scout",
+        'fav': 100 + i, 'ep': 10, 'al': 50, 'ratio': (100 + i) / 10,
+        'tags': "판타지,회귀,먼치킨", 'is_19': 0, 'is_plus': 0,
+        'url': "", 'date': now,
+    } for i in range(rows)]
+    t0 = time.perf_counter()
+    for i in range(0, rows, batch_size):
+        db.save_novels(records[i:i + batch_size])
+    return {"rows": rows, "rows_per_sec": round(rows / (time.perf_counter() - t0), 1)}
+
+
+def run_benchmark(ids=1000, start_id=1, concurrency=32, rate_limit=0, parse_processes=0,
+                  latency=0.05, jitter=0.02, error_rate=0.0, seed=None):
+    with tempfile.TemporaryDirectory() as tmp, \
+            MockNovelpiaServer(latency, jitter, error_rate, seed=seed) as server:
+        db = NovelDB(str(Path(tmp) / "bench.db"))
+        with NovelpiaScraper(db) as scraper:
+            scraper.base_url = server.base_url
+            engine = ScanEngine(scraper, concurrency=concurrency, rate_limit=rate_limit,
+                                parse_processes=parse_processes)
+            t0 = time.perf_counter()
+            results = engine.run(range(start_id, start_id + ids))
+            elapsed = time.perf_counter() - t0
+
+        outcomes = {}
+        for res in results.values():
+            key = res.split(" ", 1)[0].rstrip(":")
+            outcomes[key] = outcomes.get(key, 0) + 1
+
+        report = {
+            "ids": ids,
+            "elapsed_sec": round(elapsed, 2),
+            "ids_per_sec": round(ids / elapsed, 1),
+            "outcomes": outcomes,
+            "stages": engine.stats(),
+            "parse": bench_parse(),
+            "db_writes": bench_db_writes(db),
+        }
+        db.close()
+        return report
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Offline NovelpiaScraper / NovelDB benchmark")
+    ap.add_argument("--ids", type=int, default=1000)
+    ap.add_argument("--start", type=int, default=1)
+    ap.add_argument("--concurrency", type=int, default=32)
+    ap.add_argument("--rate", type=float, default=0, help="req/sec cap, 0 = unlimited")
+    ap.add_argument("--parse-processes", type=int, default=0)
+    ap.add_argument("--latency", type=float, default=50, help="mean server latency (ms)")
+    ap.add_argument("--jitter", type=float, default=20, help="+/- latency jitter (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="fraction of 503 replies")
+    ap.add_argument("--seed", type=int, default=None)
+    args = ap.parse_args(argv)
+
+    report = run_benchmark(
+        ids=args.ids, start_id=args.start, concurrency=args.concurrency, rate_limit=args.rate,
+        parse_processes=args.parse_processes, latency=args.latency / 1000,
+        jitter=args.jitter / 1000, error_rate=args.error_rate, seed=args.seed,
+    )
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
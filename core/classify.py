@@ -0,0 +1,86 @@
+"""
+18+ classification. A rule set gives each signal a weight: red-flag tags, and
+markers in the raw page body. A novel is 18+ once the weights of the distinct
+signals it shows reach the threshold.
+
+Each signal source compiles into one alternation regex, so a page or tag string
+is scanned once however many rules there are. Rule sets are versioned: the
+vault keeps its active version in db_meta and records which version classified
+each novel. NovelDB.reclassify_adult(get_classifier("v2")) switches the active
+version and re-scores from stored tags and body markers, without re-scraping.
+"""
+import re
+
+RULESETS = {
+    # The original scrape_novel logic: any one red-flag tag or "19세" on the page
+    "v1": {
+        "threshold": 1.0,
+        "tags": {flag: 1.0 for flag in (
+            "ntl", "ntr", "고수위", "조교", "능욕", "최면",
+            "관음", "역강간", "촉수", "근친", "절륜", "성인",
+        )},
+        "body": {"19세": 1.0},
+    },
+    # Adds the explicit tags from tag_map.json; softer tropes need a second signal
+    "v2": {
+        "threshold": 1.0,
+        "tags": {
+            "고수위": 1.0, "능욕": 1.0, "역강간": 1.0, "촉수": 1.0, "근친": 1.0, "성인": 1.0,
+            "하드코어": 1.0, "조교": 1.0, "최면": 1.0,
+            "ntl": 0.6, "ntr": 0.6, "mtr": 0.6, "관음": 0.6, "절륜": 0.6, "약한조교": 0.6,
+            "하드": 0.5, "milf": 0.5,
+        },
+        "body": {"19세": 1.0},
+    },
+}
+DEFAULT_RULESET = "v1"  # for vaults that never switched rule sets
+
+# Body marker recorded for novels whose 18+ flag predates stored markers
+# (legacy imports, pre-classifier scrapes) and isn't explained by their tags
+LEGACY_BODY_MARKER = "19세"
+
+
+def _alternation(words):
+    # Longest first, so 약한조교 wins over 조교 at the same position
+    return "|".join(re.escape(w) for w in sorted(words, key=len, reverse=True))
+
+
+class AdultClassifier:
+    """Compiled, picklable rule set (safe to hand to a parse process pool)."""
+
+    def __init__(self, version=DEFAULT_RULESET, rules=None):
+        rules = rules or RULESETS[version]
+        self.version = version
+        self.threshold = rules["threshold"]
+        self.tag_weights = {k.lower(): w for k, w in rules["tags"].items()}
+        self.body_weights = dict(rules["body"])
+        # A tag only counts when it is a whole comma-delimited entry
+        self._tag_re = re.compile(rf"(?<![^,])\s*({_alternation(self.tag_weights)})\s*(?![^,])", re.I)
+        self._body_re = re.compile(_alternation(self.body_weights)) if self.body_weights else None
+
+    def tag_hits(self, tags):
+        return {m.group(1).lower() for m in self._tag_re.finditer(tags or "")}
+
+    def body_hits(self, page):
+        """Distinct body markers found in the raw page; store them to reclassify later."""
+        if self._body_re is None or not page:
+            return set()
+        return set(self._body_re.findall(page))
+
+    def score(self, tag_hits, body_hits):
+        return (sum((self.tag_weights.get(t, 0.0) for t in tag_hits), 0.0)
+                + sum((self.body_weights.get(b, 0.0) for b in body_hits), 0.0))
+
+    def classify(self, tags, body_hits=()):
+        """(is_19, score) from a comma-joined tag string and a set of body markers."""
+        score = self.score(self.tag_hits(tags), body_hits)
+        return int(score >= self.threshold), round(score, 3)
+
+
+_CACHE = {}
+
+
+def get_classifier(version=DEFAULT_RULESET):
+    if version not in _CACHE:
+        _CACHE[version] = AdultClassifier(version)
+    return _CACHE[version]
@@ -1,37 +1,350 @@
 import sqlite3
 from datetime import datetime
 from collections import Counter
+from core.classify import DEFAULT_RULESET, LEGACY_BODY_MARKER, RULESETS, get_classifier
+from core.mappings import TAGS, translate_tag_series, translate_tags
+from core.migrations import add_column, current_version, migrate
+from core.pool import ConnectionPool
+
+def split_tags(tag_string):
+    """Comma-joined tag column -> unique, stripped tag names (order preserved)."""
+    if not tag_string:
+        return []
+    return list(dict.fromkeys(t.strip() for t in tag_string.split(',') if t.strip()))
 
 class NovelDB:
+    # Days until a blacklisted ID may be re-probed; doubles with each failed re-probe
+    # (capped at 16x). Reasons not listed here are permanent.
+    BLACKLIST_TTL_DAYS = {"LOW_SIGNAL": 7, "404": 30}
+
+    # Vault sort keys -> ORDER BY. Ties fall back to novel_id DESC so pages never
+    # overlap, and so a backwards scan of the (.., ratio) indexes needs no sort step.
+    VAULT_SORTS = {
+        "ratio": "ratio DESC",
+        "fav": "fav DESC",
+        "newest": "novel_id DESC",
+        "updated": "last_updated DESC",
+        "growth": "growth DESC",
+    }
+
+    # Fav growth per novel: latest snapshot vs. the newest one at or before :cutoff
+    # (or the oldest, for younger novels). {scope} optionally narrows the novels.
+    _GROWTH_CTE = """
+        edges AS (
+            SELECT novel_id,
+                   MAX(ts) AS ts_now,
+                   COALESCE(MAX(CASE WHEN ts <= :cutoff THEN ts END), MIN(ts)) AS ts_then
+            FROM novel_snapshots {scope}
+            GROUP BY novel_id
+        ),
+        growth AS (
+            SELECT e.novel_id,
+                   cur.fav - old.fav AS fav_gain,
+                   (cur.fav - old.fav) * 86400.0 / (e.ts_now - e.ts_then) AS fav_per_day
+            FROM edges e
+            JOIN novel_snapshots cur ON cur.novel_id = e.novel_id AND cur.ts = e.ts_now
+            JOIN novel_snapshots old ON old.novel_id = e.novel_id AND old.ts = e.ts_then
+            WHERE e.ts_now > e.ts_then
+        )
+    """
+
     def __init__(self, db_path="npia_scout.db"):
         self.db_path = db_path
+        self.pool = ConnectionPool(db_path)
         self._init_db()
 
     def get_connection(self):
-        # check_same_thread=False is essential for Streamlit's multi-threaded nature
-        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=30)
-        conn.execute("PRAGMA journal_mode=WAL;") 
-        return conn
+        """Read connection owned by the calling thread; pooled, so callers must not close it."""
+        return self.pool.reader()
+
+    def close(self):
+        self.pool.close()
+
+    # Schema history, oldest first: (user_version, description, method). Each step
+    # runs once per file, in its own transaction (see core.migrations.migrate).
+    # Append new steps; never edit one that has shipped.
+    MIGRATIONS = (
+        (1, "core tables", "_init_core_tables"),
+        (2, "normalized tags and tag_stats", "_init_tags"),
+        (3, "scan jobs", "_init_scan_jobs"),
+        (4, "fav velocity and snapshots", "_init_snapshots"),
+        (5, "blacklist re-probe schedule", "_init_reprobe"),
+        (6, "vault query indexes and change counter", "_init_data_version"),
+        (7, "translated tags and translation cache", "_init_translations"),
+        (8, "legacy views/recs columns", "_init_legacy_stats"),
+        (9, "full-text search", "_init_search"),
+        (10, "adult classifier scores", "_init_adult_rules"),
+    )
+
+    # trigram indexes every 3-character window, so Korean matches mid-word without
+    # a morphological analyzer; SQLite < 3.34 lacks it and gets word tokens instead.
+    SEARCH_TOKENIZER = "trigram" if sqlite3.sqlite_version_info >= (3, 34, 0) else "unicode61"
 
     def _init_db(self):
-        with self.get_connection() as conn:
+        with self.pool.writer() as conn:
+            migrate(conn, [(v, desc, getattr(self, name)) for v, desc, name in self.MIGRATIONS])
+            self._sync_translations(conn)
+            # Rows classified under another rule set version (or none) get re-scored
+            self._reclassify(conn, get_classifier(self._adult_ruleset(conn)))
+
+    def schema_version(self):
+        return current_version(self.get_connection())
+
+    def _init_core_tables(self, conn):
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS valid_novels (
+                novel_id INTEGER PRIMARY KEY,
+                title TEXT, author TEXT,
+                fav INTEGER, ep INTEGER, al INTEGER,
+                ratio REAL, tags TEXT, 
+                is_19 INTEGER, is_plus INTEGER,
+                url TEXT, last_updated DATETIME
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS blacklist (
+                novel_id INTEGER PRIMARY KEY,
+                reason TEXT, scraped_at DATETIME
+            )
+        """)
+
+    def _init_tags(self, conn):
+        # Normalized tags: dictionary + junction table (the inverted index)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tags (
+                tag_id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS novel_tags (
+                novel_id INTEGER NOT NULL REFERENCES valid_novels(novel_id) ON DELETE CASCADE,
+                tag_id INTEGER NOT NULL REFERENCES tags(tag_id),
+                PRIMARY KEY (novel_id, tag_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_novel_tags_tag ON novel_tags(tag_id, novel_id)")
+        self._init_tag_stats(conn)
+        self._migrate_tags(conn)
+
+    def _init_reprobe(self, conn):
+        add_column(conn, "blacklist", "probes", "INTEGER NOT NULL DEFAULT 1")
+        add_column(conn, "blacklist", "next_probe", "DATETIME")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_blacklist_next_probe ON blacklist(next_probe)")
+        # Schedule entries written before re-probing existed
+        conn.execute(f"""
+            UPDATE blacklist SET next_probe = {self._next_probe_sql('reason', 'scraped_at', 'probes')}
+            WHERE next_probe IS NULL AND reason IN ({",".join("?" * len(self.BLACKLIST_TTL_DAYS))})
+        """, tuple(self.BLACKLIST_TTL_DAYS))
+
+    def _init_translations(self, conn):
+        # English tags, translated once at write time rather than on every render
+        add_column(conn, "valid_novels", "tags_en", "TEXT")
+        self._retranslate(conn, "WHERE tags_en IS NULL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_cache (
+                tag TEXT NOT NULL,
+                backend TEXT NOT NULL,
+                translated TEXT NOT NULL,
+                created_at DATETIME,
+                PRIMARY KEY (tag, backend)
+            ) WITHOUT ROWID
+        """)
+
+    def _init_legacy_stats(self, conn):
+        """Columns from the old archiver schema (database_deprecated.py), filled by core.archive imports."""
+        add_column(conn, "valid_novels", "views", "INTEGER")
+        add_column(conn, "valid_novels", "recs", "INTEGER")
+
+    def _init_adult_rules(self, conn):
+        """Which rule set classified each novel, its score, and the body markers it matched."""
+        add_column(conn, "valid_novels", "adult_score", "REAL")
+        add_column(conn, "valid_novels", "adult_rules", "TEXT")
+        add_column(conn, "valid_novels", "adult_body", "TEXT")
+
+    def _init_search(self, conn):
+        """
+        Two FTS5 indexes over title, Korean tags and English tags: novel_search
+        (SEARCH_TOKENIZER) for terms of 3+ characters, and novel_search_words
+        (whole words) for the 2-syllable Korean words a trigram index can't see.
+        Both are external-content tables, so the text lives only in valid_novels
+        and triggers keep them in step. Without FTS5, search_vault uses LIKE.
+        """
+        try:
+            for table, tokenizer in (("novel_search", self.SEARCH_TOKENIZER), ("novel_search_words", "unicode61")):
+                conn.execute(f"""
+                    CREATE VIRTUAL TABLE IF NOT EXISTS {table} USING fts5(
+                        title, tags, tags_en,
+                        content='valid_novels', content_rowid='novel_id',
+                        tokenize='{tokenizer}'
+                    )
+                """)
+        except sqlite3.OperationalError as e:
+            print(f"Search Index Unavailable: {e}")
+            return
+        insert = delete = ""
+        for table in ("novel_search", "novel_search_words"):
+            insert += f"""INSERT INTO {table} (rowid, title, tags, tags_en)
+                          VALUES (NEW.novel_id, NEW.title, NEW.tags, NEW.tags_en);"""
+            delete += f"""INSERT INTO {table} ({table}, rowid, title, tags, tags_en)
+                          VALUES ('delete', OLD.novel_id, OLD.title, OLD.tags, OLD.tags_en);"""
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_valid_novels_fts_ins AFTER INSERT ON valid_novels BEGIN {insert} END")
+        conn.execute(f"CREATE TRIGGER IF NOT EXISTS trg_valid_novels_fts_del AFTER DELETE ON valid_novels BEGIN {delete} END")
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_valid_novels_fts_upd AFTER UPDATE OF title, tags, tags_en ON valid_novels
+            WHEN NEW.title IS NOT OLD.title OR NEW.tags IS NOT OLD.tags OR NEW.tags_en IS NOT OLD.tags_en
+            BEGIN {delete} {insert} END
+        """)
+        conn.execute("INSERT INTO novel_search (novel_search) VALUES ('rebuild')")
+        conn.execute("INSERT INTO novel_search_words (novel_search_words) VALUES ('rebuild')")
+
+    def _init_data_version(self, conn):
+        """
+        Change counter for valid_novels, bumped by triggers on every write path
+        (scraper, imports, manual SQL). Readers cache on it instead of re-querying.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS db_meta (
+                key TEXT PRIMARY KEY,
+                value INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("INSERT OR IGNORE INTO db_meta (key, value) VALUES ('vault_version', 0)")
+        # Vault tab: the filters are equality on is_19/is_plus, the default sort is ratio
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_valid_novels_ratio ON valid_novels(ratio)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_valid_novels_19_ratio ON valid_novels(is_19, ratio)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_valid_novels_plus_ratio ON valid_novels(is_plus, ratio)")
+        for event in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS trg_valid_novels_version_{event.lower()}
+                AFTER {event} ON valid_novels
+                BEGIN
+                    UPDATE db_meta SET value = value + 1 WHERE key = 'vault_version';
+                END
+            """)
+
+    def _init_snapshots(self, conn):
+        """
+        fav/ep/al history, one row per observed change. Triggers only write when a
+        stat actually moved, so unchanged re-scrapes add nothing. WITHOUT ROWID on
+        (novel_id, ts) keeps rows to a few dozen bytes and clusters each novel's history.
+        """
+        add_column(conn, "valid_novels", "fav_velocity", "REAL")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_valid_novels_updated ON valid_novels(last_updated)")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS novel_snapshots (
+                novel_id INTEGER NOT NULL,
+                ts INTEGER NOT NULL,  -- unix seconds of the scrape
+                fav INTEGER, ep INTEGER, al INTEGER,
+                PRIMARY KEY (novel_id, ts)
+            ) WITHOUT ROWID
+        """)
+        snapshot = """
+            INSERT OR REPLACE INTO novel_snapshots (novel_id, ts, fav, ep, al)
+            VALUES (NEW.novel_id,
+                    COALESCE(CAST(strftime('%s', NEW.last_updated) AS INTEGER),
+                             CAST(strftime('%s', 'now', 'localtime') AS INTEGER)),
+                    NEW.fav, NEW.ep, NEW.al);
+        """
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_valid_novels_snap_ins AFTER INSERT ON valid_novels
+            BEGIN {snapshot} END
+        """)
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS trg_valid_novels_snap_upd AFTER UPDATE OF fav, ep, al ON valid_novels
+            WHEN NEW.fav IS NOT OLD.fav OR NEW.ep IS NOT OLD.ep OR NEW.al IS NOT OLD.al
+            BEGIN {snapshot} END
+        """)
+        # Seed history for vaults that predate snapshots
+        if not conn.execute("SELECT 1 FROM novel_snapshots LIMIT 1").fetchone():
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS valid_novels (
-                    novel_id INTEGER PRIMARY KEY,
-                    title TEXT, author TEXT,
-                    fav INTEGER, ep INTEGER, al INTEGER,
-                    ratio REAL, tags TEXT, 
-                    is_19 INTEGER, is_plus INTEGER,
-                    url TEXT, last_updated DATETIME
-                )
+                INSERT OR IGNORE INTO novel_snapshots (novel_id, ts, fav, ep, al)
+                SELECT novel_id, COALESCE(CAST(strftime('%s', last_updated) AS INTEGER), 0), fav, ep, al
+                FROM valid_novels
             """)
+
+    def _next_probe_sql(self, reason, scraped_at, probes):
+        """SQL expression for when a blacklist entry becomes eligible again (NULL = never)."""
+        cases = " ".join(f"WHEN '{r}' THEN {days}" for r, days in self.BLACKLIST_TTL_DAYS.items())
+        return f"""datetime({scraped_at}, '+' || (
+            (CASE {reason} {cases} END) * (1 << MIN({probes} - 1, 4))
+        ) || ' days')"""
+
+    def _init_scan_jobs(self, conn):
+        """Checkpointed sweeps: one row per job, one row per ID that has an outcome."""
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_jobs (
+                job_id INTEGER PRIMARY KEY,
+                start_id INTEGER NOT NULL, end_id INTEGER NOT NULL,
+                cursor INTEGER,
+                status TEXT NOT NULL DEFAULT 'queued',
+                concurrency INTEGER, rate_limit REAL,
+                error TEXT, worker_pid INTEGER,
+                created_at DATETIME, updated_at DATETIME
+            )
+        """)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS scan_job_items (
+                job_id INTEGER NOT NULL REFERENCES scan_jobs(job_id) ON DELETE CASCADE,
+                novel_id INTEGER NOT NULL,
+                outcome TEXT NOT NULL, detail TEXT,
+                attempts INTEGER NOT NULL DEFAULT 1,
+                updated_at DATETIME,
+                PRIMARY KEY (job_id, novel_id)
+            ) WITHOUT ROWID
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_scan_job_items_outcome ON scan_job_items(job_id, outcome)")
+
+    def _init_tag_stats(self, conn):
+        """
+        Tag frequencies maintained by triggers on novel_tags, so the dashboard
+        reads a precomputed aggregate. UPSERTs re-link tags via delete + insert,
+        which keeps counts right when a novel's tags change.
+        """
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS tag_stats (
+                tag_id INTEGER PRIMARY KEY REFERENCES tags(tag_id),
+                freq INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_novel_tags_ins AFTER INSERT ON novel_tags
+            BEGIN
+                INSERT INTO tag_stats (tag_id, freq) VALUES (NEW.tag_id, 1)
+                ON CONFLICT(tag_id) DO UPDATE SET freq = freq + 1;
+            END
+        """)
+        conn.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_novel_tags_del AFTER DELETE ON novel_tags
+            BEGIN
+                UPDATE tag_stats SET freq = freq - 1 WHERE tag_id = OLD.tag_id;
+            END
+        """)
+        # Vaults that already had novel_tags before the triggers existed
+        if not conn.execute("SELECT 1 FROM tag_stats LIMIT 1").fetchone():
             conn.execute("""
-                CREATE TABLE IF NOT EXISTS blacklist (
-                    novel_id INTEGER PRIMARY KEY,
-                    reason TEXT, scraped_at DATETIME
-                )
+                INSERT INTO tag_stats (tag_id, freq)
+                SELECT tag_id, COUNT(*) FROM novel_tags GROUP BY tag_id
             """)
 
+    def _migrate_tags(self, conn):
+        """One-shot backfill of novel_tags for vaults created before tag normalization."""
+        if conn.execute("SELECT 1 FROM novel_tags LIMIT 1").fetchone():
+            return
+        rows = conn.execute("SELECT novel_id, tags FROM valid_novels WHERE tags != ''").fetchall()
+        if rows:
+            self._sync_tags(conn, rows)
+
+    def _sync_tags(self, conn, rows):
+        """rows: (novel_id, tag_string). Replaces each novel's tag links."""
+        links = [(nid, tag) for nid, tag_str in rows for tag in split_tags(tag_str)]
+        conn.executemany("INSERT OR IGNORE INTO tags (name) VALUES (?)", {(tag,) for _, tag in links})
+        conn.executemany("DELETE FROM novel_tags WHERE novel_id = ?", [(nid,) for nid, _ in rows])
+        conn.executemany("""
+            INSERT OR IGNORE INTO novel_tags (novel_id, tag_id)
+            SELECT ?, tag_id FROM tags WHERE name = ?
+        """, links)
+
     def check_exists(self, novel_id):
         with self.get_connection() as conn:
             cursor = conn.cursor()
@@ -40,64 +353,508 @@ class NovelDB:
                     SELECT novel_id FROM valid_novels WHERE novel_id = ?
                     UNION ALL 
                     SELECT novel_id FROM blacklist WHERE novel_id = ?
+                    AND (next_probe IS NULL OR next_probe > datetime('now', 'localtime'))
                 ) LIMIT 1
             """, (novel_id, novel_id))
             return cursor.fetchone() is not None
 
-    def save_novel(self, data):
+    def get_known_ids(self, start_id, end_id, include_blacklist=True):
+        """
+        All vaulted (and by default blacklisted) IDs in [start_id, end_id], fetched in one pass.
+        Blacklist entries due for a re-probe don't count as known, so sweeps pick them up.
+        """
+        sql = "SELECT novel_id FROM valid_novels WHERE novel_id BETWEEN ? AND ?"
+        params = (int(start_id), int(end_id))
+        if include_blacklist:
+            sql += """
+                UNION SELECT novel_id FROM blacklist WHERE novel_id BETWEEN ? AND ?
+                AND (next_probe IS NULL OR next_probe > datetime('now', 'localtime'))
+            """
+            params *= 2
         with self.get_connection() as conn:
-            conn.execute("""
+            return {row[0] for row in conn.execute(sql, params)}
+
+    def get_max_novel_id(self):
+        """Highest vaulted ID: the publishing frontier as far as we know it."""
+        row = self.get_connection().execute("SELECT MAX(novel_id) FROM valid_novels").fetchone()
+        return row[0]
+
+    def save_novel(self, data):
+        self.save_novels([data])
+
+    def save_novels(self, rows):
+        """Upserts a batch of scraped novels in a single transaction."""
+        with self.pool.writer() as conn:
+            conn.executemany("""
                 INSERT INTO valid_novels (
                     novel_id, title, author, fav, ep, al, 
-                    ratio, tags, is_19, is_plus, url, last_updated
+                    ratio, tags, tags_en, is_19, is_plus, url, last_updated,
+                    adult_score, adult_rules, adult_body
                 ) VALUES (
                     :id, :title, :author, :fav, :ep, :al, 
-                    :ratio, :tags, :is_19, :is_plus, :url, :date
+                    :ratio, :tags, :tags_en, :is_19, :is_plus, :url, :date,
+                    :adult_score, :adult_rules, :adult_body
                 )
                 ON CONFLICT(novel_id) DO UPDATE SET 
-                fav=excluded.fav, ep=excluded.ep, ratio=excluded.ratio, 
-                tags=excluded.tags, last_updated=excluded.last_updated
-            """, data)
+                fav=excluded.fav, ep=excluded.ep, al=excluded.al, ratio=excluded.ratio, 
+                tags=excluded.tags, tags_en=excluded.tags_en, last_updated=excluded.last_updated,
+                is_19=excluded.is_19, adult_score=excluded.adult_score,
+                adult_rules=excluded.adult_rules, adult_body=excluded.adult_body,
+                -- favs gained per day since the previous scrape (same-hour re-scrapes keep the old value)
+                fav_velocity=CASE
+                    WHEN julianday(excluded.last_updated) - julianday(last_updated) > 0.04
+                    THEN (excluded.fav - fav) / (julianday(excluded.last_updated) - julianday(last_updated))
+                    ELSE fav_velocity
+                END
+            """, [{'adult_score': None, 'adult_rules': None, 'adult_body': None, **row,
+                   'tags_en': translate_tags(row['tags'])} for row in rows])
+            self._sync_tags(conn, [(row['id'], row['tags']) for row in rows])
+            # A re-probed ID that came back valid is no longer blacklisted
+            conn.executemany("DELETE FROM blacklist WHERE novel_id = ?", [(row['id'],) for row in rows])
+
+    def import_legacy_novels(self, rows):
+        """
+        Bulk insert of rows mapped from the legacy JSON archive, in one transaction.
+        Novels already in the vault keep their scraped data and only pick up `views`.
+        Returns the number of new novels.
+        """
+        ids = [row['id'] for row in rows]
+        with self.pool.writer() as conn:
+            existing = {r[0] for r in conn.execute(
+                f"SELECT novel_id FROM valid_novels WHERE novel_id IN ({','.join('?' * len(ids))})", ids)}
+            classifier = get_classifier(self._adult_ruleset(conn))
+            conn.executemany("""
+                INSERT INTO valid_novels (
+                    novel_id, title, author, ep, views, tags, tags_en, is_19, is_plus, url, last_updated,
+                    adult_score, adult_rules, adult_body
+                ) VALUES (
+                    :id, :title, :author, :ep, :views, :tags, :tags_en, :is_19, :is_plus, :url, :date,
+                    :adult_score, :adult_rules, :adult_body
+                )
+                ON CONFLICT(novel_id) DO UPDATE SET views=COALESCE(excluded.views, views)
+            """, [{**row, 'tags_en': translate_tags(row['tags']),
+                   **dict(zip(('is_19', 'adult_score', 'adult_rules', 'adult_body'),
+                              self._classify_row(classifier, row['tags'], row['is_19'])))}
+                  for row in rows])
+            new = [(row['id'], row['tags']) for row in rows if row['id'] not in existing]
+            self._sync_tags(conn, new)
+            return len(new)
+
+    def import_blacklist(self, rows):
+        """
+        rows: (novel_id, reason, scraped_at). IDs already vaulted or blacklisted are
+        left alone; new entries get the normal re-probe schedule.
+        """
+        with self.pool.writer() as conn:
+            cursor = conn.executemany(f"""
+                INSERT OR IGNORE INTO blacklist (novel_id, reason, scraped_at, next_probe)
+                SELECT ?1, ?2, ?3, {self._next_probe_sql('?2', '?3', '1')}
+                WHERE NOT EXISTS (SELECT 1 FROM valid_novels WHERE novel_id = ?1)
+            """, rows)
+            return cursor.rowcount
+
+    def get_adult_ruleset(self):
+        """Rule set version this vault classifies 18+ with (core.classify.RULESETS)."""
+        return self._adult_ruleset(self.get_connection())
+
+    def _adult_ruleset(self, conn):
+        row = conn.execute("SELECT value FROM db_meta WHERE key = 'adult_ruleset'").fetchone()
+        return row[0] if row and row[0] in RULESETS else DEFAULT_RULESET
+
+    def adult_classifier(self):
+        return get_classifier(self.get_adult_ruleset())
+
+    def reclassify_adult(self, classifier=None, force=False):
+        """
+        Makes `classifier`'s rule set the vault's active one (kept in db_meta, so
+        later opens and scrapers use it too) and re-scores 18+ flags from stored
+        tags and body markers for novels classified under another version (every
+        novel with force=True). No re-scraping needed, though body markers only a
+        new rule set knows about show up on the next scrape. Returns the number of
+        novels updated.
+        """
+        with self.pool.writer() as conn:
+            if classifier is None:
+                classifier = get_classifier(self._adult_ruleset(conn))
+            elif classifier.version not in RULESETS:
+                raise ValueError(f"Unknown rule set: {classifier.version}")
+            conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('adult_ruleset', ?)",
+                         (classifier.version,))
+            return self._reclassify(conn, classifier, force)
+
+    def _classify_row(self, classifier, tags, is_19, rules=None, body=None):
+        """(is_19, adult_score, adult_rules, adult_body) for one stored novel."""
+        if rules is None:
+            # Flagged before markers were stored: if the original tag rules
+            # don't explain the flag, it came from the page body
+            body = LEGACY_BODY_MARKER if is_19 and not get_classifier("v1").classify(tags)[0] else ""
+        hits = set(filter(None, (body or "").split(",")))
+        flag, score = classifier.classify(tags, hits)
+        return flag, score, classifier.version, ",".join(sorted(hits))
+
+    def _reclassify(self, conn, classifier, force=False, batch_size=5000):
+        changed, last_id = 0, -1
+        while True:
+            # Keyset pages keep memory flat on big vaults
+            rows = conn.execute(f"""
+                SELECT novel_id, tags, is_19, adult_rules, adult_body FROM valid_novels
+                WHERE novel_id > ? {"" if force else "AND adult_rules IS NOT ?"}
+                ORDER BY novel_id LIMIT ?
+            """, (last_id, batch_size) if force else (last_id, classifier.version, batch_size)).fetchall()
+            if not rows:
+                return changed
+            updates = [(*self._classify_row(classifier, tags, is_19, rules, body), nid)
+                       for nid, tags, is_19, rules, body in rows]
+            conn.executemany("""
+                UPDATE valid_novels SET is_19 = ?, adult_score = ?, adult_rules = ?, adult_body = ?
+                WHERE novel_id = ?
+            """, updates)
+            changed += len(updates)
+            last_id = rows[-1][0]
+
+    def retranslate_tags(self, tag_map=None):
+        """Rebuilds tags_en after the tag dictionary changed. Returns the number of novels updated."""
+        with self.pool.writer() as conn:
+            return self._retranslate(conn, tag_map=tag_map)
+
+    def sync_tag_translations(self):
+        """
+        Rebuilds tags_en if the tag dictionary changed (e.g. tag_map.json was edited)
+        since the vault was last translated. Cheap to call on every rerun.
+        """
+        # Version check on a read connection first, so the common case never waits on the write lock
+        if self._tag_map_current(self.get_connection()):
+            return 0
+        with self.pool.writer() as conn:
+            return self._sync_translations(conn)
+
+    def _tag_map_current(self, conn):
+        TAGS.mapping()
+        row = conn.execute("SELECT value FROM db_meta WHERE key = 'tag_map_version'").fetchone()
+        return row is not None and row[0] == TAGS.version
+
+    def _sync_translations(self, conn):
+        if self._tag_map_current(conn):
+            return 0
+        changed = self._retranslate(conn)
+        conn.execute("INSERT OR REPLACE INTO db_meta (key, value) VALUES ('tag_map_version', ?)",
+                     (TAGS.version,))
+        return changed
+
+    def _retranslate(self, conn, where="", tag_map=None):
+        rows = conn.execute(f"SELECT novel_id, tags FROM valid_novels {where}").fetchall()
+        if not rows:
+            return 0
+        # Novels share tag strings, so each distinct one is translated once
+        english = translate_tag_series([tags for _, tags in rows], tag_map)
+        # Only touch rows whose translation moved, so the vault version isn't bumped for nothing
+        cursor = conn.executemany(
+            "UPDATE valid_novels SET tags_en = ? WHERE novel_id = ? AND tags_en IS NOT ?",
+            [(en, nid, en) for (nid, _), en in zip(rows, english)])
+        return cursor.rowcount
 
     def add_to_blacklist(self, novel_id, reason):
-        with self.get_connection() as conn:
-            conn.execute("INSERT OR IGNORE INTO blacklist VALUES (?, ?, ?)", 
-                         (novel_id, reason, datetime.now()))
+        self.add_many_to_blacklist([(novel_id, reason, datetime.now())])
+
+    def add_many_to_blacklist(self, rows):
+        """
+        rows: (novel_id, reason, scraped_at) tuples, written in one transaction.
+        Re-blacklisting an ID counts as a failed re-probe and pushes its next probe further out.
+        """
+        with self.pool.writer() as conn:
+            conn.executemany(f"""
+                INSERT INTO blacklist (novel_id, reason, scraped_at, next_probe)
+                VALUES (?1, ?2, ?3, {self._next_probe_sql('?2', '?3', '1')})
+                ON CONFLICT(novel_id) DO UPDATE SET
+                reason=excluded.reason, scraped_at=excluded.scraped_at, probes=probes + 1,
+                next_probe={self._next_probe_sql('excluded.reason', 'excluded.scraped_at', 'probes + 1')}
+            """, rows)
+
+    def get_reprobe_ids(self, limit=1000, reason=None):
+        """Blacklisted IDs whose re-probe time has come, most overdue first."""
+        sql = """
+            SELECT novel_id FROM blacklist
+            WHERE next_probe <= datetime('now', 'localtime')
+        """
+        params = []
+        if reason:
+            sql += " AND reason = ?"
+            params.append(reason)
+        sql += " ORDER BY next_probe LIMIT ?"
+        cursor = self.get_connection().execute(sql, (*params, limit))
+        return [row[0] for row in cursor]
+
+    def get_blacklist_summary(self):
+        """{reason: (total, due_for_reprobe)}"""
+        cursor = self.get_connection().execute("""
+            SELECT reason, COUNT(*), SUM(next_probe <= datetime('now', 'localtime'))
+            FROM blacklist GROUP BY reason
+        """)
+        return {reason: (total, due or 0) for reason, total, due in cursor}
+
+    def expire_blacklist(self, reason=None):
+        """Makes entries (optionally of one reason) eligible for re-probe right away."""
+        sql = "UPDATE blacklist SET next_probe = datetime('now', 'localtime')"
+        params = ()
+        if reason:
+            sql += " WHERE reason = ?"
+            params = (reason,)
+        with self.pool.writer() as conn:
+            return conn.execute(sql, params).rowcount
+
+    def get_cached_translations(self, tags, backend):
+        """{tag: translation} for the tags `backend` has already translated."""
+        tags = list(tags)
+        out = {}
+        conn = self.get_connection()
+        for i in range(0, len(tags), 500):
+            chunk = tags[i:i + 500]
+            cursor = conn.execute(f"""
+                SELECT tag, translated FROM translation_cache
+                WHERE backend = ? AND tag IN ({",".join("?" * len(chunk))})
+            """, (backend, *chunk))
+            out.update(cursor.fetchall())
+        return out
+
+    def cache_translations(self, translations, backend):
+        if not translations:
+            return
+        now = datetime.now()
+        with self.pool.writer() as conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO translation_cache (tag, backend, translated, created_at) VALUES (?, ?, ?, ?)",
+                [(tag, backend, text, now) for tag, text in translations.items()])
 
     def get_tag_stats(self):
         with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT tags FROM valid_novels WHERE tags != ''")
-            all_tags = []
-            for row in cursor.fetchall():
-                all_tags.extend([t.strip() for t in row[0].split(',') if t.strip()])
-            return Counter(all_tags)
+            cursor = conn.execute("""
+                SELECT t.name, s.freq FROM tag_stats s
+                JOIN tags t ON t.tag_id = s.tag_id
+                WHERE s.freq > 0
+            """)
+            return Counter(dict(cursor.fetchall()))
+
+    def get_novels_with_tags(self, tags):
+        """IDs of novels carrying every tag in `tags` (AND), resolved via the tag index."""
+        tags = list(dict.fromkeys(tags))
+        if not tags:
+            return []
+        marks = ",".join("?" * len(tags))
+        with self.get_connection() as conn:
+            cursor = conn.execute(f"""
+                SELECT nt.novel_id FROM novel_tags nt
+                JOIN tags t ON t.tag_id = nt.tag_id
+                WHERE t.name IN ({marks})
+                GROUP BY nt.novel_id
+                HAVING COUNT(*) = ?
+                ORDER BY nt.novel_id
+            """, (*tags, len(tags)))
+            return [row[0] for row in cursor]
+
+    def get_data_version(self):
+        """Bumped on every change to valid_novels; use it as a cache key."""
+        return self.get_connection().execute(
+            "SELECT value FROM db_meta WHERE key = 'vault_version'").fetchone()[0]
+
+    def _vault_where(self, plus_only, adult_only):
+        clauses = [sql for sql, on in (("is_plus = 1", plus_only), ("is_19 = 1", adult_only)) if on]
+        return "WHERE " + " AND ".join(clauses) if clauses else ""
+
+    def count_vault(self, plus_only=False, adult_only=False):
+        where = self._vault_where(plus_only, adult_only)
+        return self.get_connection().execute(f"SELECT COUNT(*) FROM valid_novels {where}").fetchone()[0]
+
+    def query_vault(self, plus_only=False, adult_only=False, sort="ratio", limit=100, offset=0, growth_days=7):
+        """
+        One page of the vault as dicts, filtered, sorted and paged in SQL.
+        Each row also carries fav_gain and growth (favs/day over `growth_days`).
+        """
+        order = self.VAULT_SORTS[sort]
+        where = self._vault_where(plus_only, adult_only)
+        params = {"cutoff": self._epoch_now() - int(growth_days * 86400),
+                  "limit": int(limit), "offset": int(offset)}
+        if sort == "growth":
+            # Growth decides the order, so it has to be computed for every match
+            sql = f"""
+                WITH {self._GROWTH_CTE.format(scope="")}
+                SELECT v.*, COALESCE(g.fav_gain, 0) AS fav_gain, COALESCE(g.fav_per_day, 0.0) AS growth
+                FROM valid_novels v LEFT JOIN growth g ON g.novel_id = v.novel_id
+                {where}
+                ORDER BY {order}, v.novel_id DESC LIMIT :limit OFFSET :offset
+            """
+        else:
+            # Page off the index first, then work out growth for just those rows
+            sql = f"""
+                WITH page AS (
+                    SELECT * FROM valid_novels {where}
+                    ORDER BY {order}, novel_id DESC LIMIT :limit OFFSET :offset
+                ),
+                {self._GROWTH_CTE.format(scope="WHERE novel_id IN (SELECT novel_id FROM page)")}
+                SELECT p.*, COALESCE(g.fav_gain, 0) AS fav_gain, COALESCE(g.fav_per_day, 0.0) AS growth
+                FROM page p LEFT JOIN growth g ON g.novel_id = p.novel_id
+                ORDER BY {order}, p.novel_id DESC
+            """
+        cursor = self.get_connection().execute(sql, params)
+        cols = [c[0] for c in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+    def has_search_index(self):
+        return self.get_connection().execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'novel_search'").fetchone() is not None
+
+    def search_vault(self, query, limit=50, plus_only=False, adult_only=False):
+        """
+        Novels whose title or tags (Korean or English) match every term of `query`,
+        best bm25 match first (title hits weigh most). Terms of 3+ characters match
+        anywhere via the trigram index; shorter ones match the start of a word
+        (so 독점 finds 독점의), via the word index.
+        """
+        terms = query.split()
+        if not terms:
+            return []
+        filters = [sql for sql, on in (("v.is_plus = 1", plus_only), ("v.is_19 = 1", adult_only)) if on]
+        if not self.has_search_index():
+            return self._like_search(terms, filters, limit)
+        phrase = lambda t: '"' + t.replace('"', '""') + '"'
+        long_terms = [phrase(t) for t in terms if len(t) >= 3]
+        short_terms = [phrase(t) + "*" for t in terms if len(t) < 3]
+        # Rank from one index; the other (mixed queries only) narrows through an
+        # uncorrelated IN, so each MATCH runs once instead of once per joined row
+        rank_table, parts = ("novel_search", long_terms) if long_terms else ("novel_search_words", short_terms)
+        where, params = [f"{rank_table} MATCH ?"], [" AND ".join(parts)]
+        if long_terms and short_terms:
+            where.append("v.novel_id IN (SELECT rowid FROM novel_search_words WHERE novel_search_words MATCH ?)")
+            params.append(" AND ".join(short_terms))
+        cursor = self.get_connection().execute(f"""
+            SELECT v.*, bm25({rank_table}, 10.0, 2.0, 2.0) AS rank
+            FROM {rank_table} JOIN valid_novels v ON v.novel_id = {rank_table}.rowid
+            WHERE {" AND ".join(where + filters)}
+            ORDER BY rank LIMIT ?
+        """, (*params, int(limit)))
+        cols = [c[0] for c in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+    def _like_search(self, terms, filters, limit):
+        """Index-free fallback for SQLite builds without FTS5: substring match, best ratio first."""
+        like = "(v.title LIKE ? ESCAPE '\\' OR v.tags LIKE ? ESCAPE '\\' OR v.tags_en LIKE ? ESCAPE '\\')"
+        patterns = ["%" + t.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%" for t in terms]
+        cursor = self.get_connection().execute(f"""
+            SELECT v.*, NULL AS rank FROM valid_novels v
+            WHERE {" AND ".join([like] * len(terms) + filters)}
+            ORDER BY v.ratio DESC LIMIT ?
+        """, (*[p for p in patterns for _ in range(3)], int(limit)))
+        cols = [c[0] for c in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+    def get_snapshots(self, novel_id):
+        """(ts, fav, ep, al) history for one novel, oldest first."""
+        cursor = self.get_connection().execute(
+            "SELECT ts, fav, ep, al FROM novel_snapshots WHERE novel_id = ? ORDER BY ts", (novel_id,))
+        return cursor.fetchall()
+
+    def get_fav_growth(self, days=7, limit=None):
+        """
+        Fav growth per novel over roughly the last `days` days: latest snapshot vs.
+        the newest one at or before the cutoff (or the oldest, for younger novels).
+        Returns (novel_id, fav_gain, fav_per_day) rows, fastest growers first.
+        """
+        cursor = self.get_connection().execute(f"""
+            WITH {self._GROWTH_CTE.format(scope="")}
+            SELECT novel_id, fav_gain, fav_per_day FROM growth
+            ORDER BY fav_per_day DESC
+            LIMIT :limit
+        """, {"cutoff": self._epoch_now() - int(days * 86400), "limit": limit or -1})
+        return cursor.fetchall()
+
+    def _epoch_now(self):
+        # Same clock as the snapshot timestamps (local time read as UTC by strftime)
+        return self.get_connection().execute(
+            "SELECT CAST(strftime('%s', 'now', 'localtime') AS INTEGER)").fetchone()[0]
+
+    # --- Scan jobs ---
+    def create_scan_job(self, start_id, end_id, concurrency=None, rate_limit=None):
+        now = datetime.now()
+        with self.pool.writer() as conn:
+            cursor = conn.execute("""
+                INSERT INTO scan_jobs (start_id, end_id, cursor, concurrency, rate_limit, created_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (int(start_id), int(end_id), int(start_id) - 1, concurrency, rate_limit, now, now))
+            return cursor.lastrowid
+
+    def get_scan_job(self, job_id):
+        cursor = self.get_connection().execute("SELECT * FROM scan_jobs WHERE job_id = ?", (job_id,))
+        row = cursor.fetchone()
+        return dict(zip([c[0] for c in cursor.description], row)) if row else None
+
+    def list_scan_jobs(self, limit=20):
+        """Most recent jobs with per-outcome item counts."""
+        cursor = self.get_connection().execute("""
+            SELECT j.*,
+                   COUNT(i.novel_id) AS done,
+                   SUM(i.outcome = 'ERR') AS failed
+            FROM scan_jobs j LEFT JOIN scan_job_items i ON i.job_id = j.job_id
+            GROUP BY j.job_id ORDER BY j.job_id DESC LIMIT ?
+        """, (limit,))
+        cols = [c[0] for c in cursor.description]
+        return [dict(zip(cols, row)) for row in cursor.fetchall()]
+
+    def set_scan_job_status(self, job_id, status, error=None, worker_pid=None):
+        with self.pool.writer() as conn:
+            conn.execute("""
+                UPDATE scan_jobs SET status = ?, error = ?, worker_pid = ?, updated_at = ?
+                WHERE job_id = ?
+            """, (status, error, worker_pid, datetime.now(), job_id))
+
+    def record_scan_job_items(self, job_id, items, cursor=None):
+        """
+        Checkpoint: items are (novel_id, outcome, detail). Re-recording an ID bumps
+        its attempt count. cursor is the last ID of the contiguous finished prefix.
+        """
+        now = datetime.now()
+        with self.pool.writer() as conn:
+            conn.executemany("""
+                INSERT INTO scan_job_items (job_id, novel_id, outcome, detail, updated_at)
+                VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(job_id, novel_id) DO UPDATE SET
+                outcome=excluded.outcome, detail=excluded.detail,
+                attempts=attempts + 1, updated_at=excluded.updated_at
+            """, [(job_id, int(nid), outcome, detail, now) for nid, outcome, detail in items])
+            if cursor is not None:
+                conn.execute("UPDATE scan_jobs SET cursor = MAX(cursor, ?), updated_at = ? WHERE job_id = ?",
+                             (int(cursor), now, job_id))
+
+    def get_failed_job_ids(self, job_id):
+        cursor = self.get_connection().execute(
+            "SELECT novel_id FROM scan_job_items WHERE job_id = ? AND outcome = 'ERR' ORDER BY novel_id",
+            (job_id,))
+        return [row[0] for row in cursor]
 
     def clear_vault(self):
-        conn = self.get_connection()
         try:
-            conn.isolation_level = None 
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM valid_novels")
-            cursor.execute("VACUUM")
+            with self.pool.writer() as conn:
+                conn.execute("DELETE FROM valid_novels")
+            # VACUUM can't run inside a transaction, so it goes after the commit
+            with self.pool.writer() as conn:
+                conn.execute("VACUUM")
             return True
         except Exception as e:
             print(f"Database Clear Error: {e}")
             return False
-        finally:
-            conn.close()
 
     def clear_blacklist(self):
-        """Wipes the blacklist so you can retry failed or rejected IDs."""
-        conn = self.get_connection()
+        """
+        Wipes the blacklist so you can retry failed or rejected IDs. Prefer
+        expire_blacklist / the re-probe schedule; this forces a re-scan of everything.
+        """
         try:
-            conn.isolation_level = None
-            cursor = conn.cursor()
-            cursor.execute("DELETE FROM blacklist")
-            cursor.execute("VACUUM")
+            with self.pool.writer() as conn:
+                conn.execute("DELETE FROM blacklist")
             return True
         except Exception as e:
             print(f"Blacklist Clear Error: {e}")
             return False
-        finally:
-            conn.close()
+
+    def compact(self):
+        """VACUUM the file. Maintenance only: it rewrites the whole DB and blocks writers."""
+        with self.pool.writer() as conn:
+            conn.execute("VACUUM")
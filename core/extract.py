@@ -0,0 +1,132 @@
+import html
+import re
+import sys
+from pathlib import Path
+
+# Everything BeautifulSoup's get_text() leaves out: comments, CDATA, doctype,
+# and the contents of script/style/template.
+_NON_TEXT = re.compile(
+    r'<!--.*?-->|<!\[CDATA\[.*?\]\]>|<![^>]*>|<\?.*?>'
+    r'|<(script|style|template)\b[^>]*>.*?</\1\s*>',
+    re.S | re.I,
+)
+_TAG = re.compile(r'<[^>]*>')
+_META = re.compile(r'<meta\b[^>]*>', re.I)
+_ATTR = re.compile(r'([\w:-]+)\s*=\s*(?:"([^"]*)"|\'([^\']*)\'|([^\s>]+))')
+
+FAV_RE = re.compile(r'선호\s*[:：]?\s*([\d,]+)')
+EP_RE = re.compile(r'회차\s*[:：]?\s*([\d,]+)')
+AL_RE = re.compile(r'알람\s*[:：]?\s*([\d,]+)')
+TAG_RE = re.compile(r'#([가-힣a-zA-Z0-9]+)')
+PLUS_RE = re.compile(r'플러스|plus', re.I)
+
+
+def visible_text(page):
+    """Regex equivalent of BeautifulSoup(page, 'lxml').get_text() without building a tree."""
+    return html.unescape(_TAG.sub('', _NON_TEXT.sub('', page)))
+
+
+def og_title(page):
+    for meta in _META.finditer(page):
+        attrs = {m.group(1).lower(): next(v for v in m.groups()[1:] if v is not None)
+                 for m in _ATTR.finditer(meta.group(0))}
+        if attrs.get("property") == "og:title":
+            return html.unescape(attrs.get("content", "Unknown"))
+    return None
+
+
+def _clean(m):
+    return int(m.group(1).replace(',', '')) if m else 0
+
+
+def extract_page(page):
+    """
+    Fast single-pass extraction of everything scrape_novel needs from a page.
+    Returns fav/ep/al, the comma-joined tag string, the raw og:title (or None),
+    and the raw-body plus marker (18+ body markers are the classifier's job).
+    """
+    text = visible_text(page)
+    return {
+        'fav': _clean(FAV_RE.search(text)),
+        'ep': _clean(EP_RE.search(text)),
+        'al': _clean(AL_RE.search(text)),
+        'tags': ",".join(set(TAG_RE.findall(text))),
+        'og_title': og_title(page),
+        'has_plus': PLUS_RE.search(page) is not None,
+    }
+
+
+def parse_novel(novel_id, url, status_code, page, classifier, fast_parse=True):
+    """
+    Pure, picklable classification of a fetched page (safe to run in a process pool).
+    `classifier` is a core.classify.AdultClassifier. Returns ("404" | "LOW_SIGNAL", None)
+    or ("OK", record) where record lacks only the write timestamp.
+    """
+    if status_code == 404:
+        return "404", None
+
+    info = extract_page(page) if fast_parse else legacy_extract_page(page)
+    fav, ep, al, tags = info['fav'], info['ep'], info['al'], info['tags']
+
+    if fav < 10 or ep < 1:
+        return "LOW_SIGNAL", None
+
+    # Body markers are kept with the record so the vault can be reclassified without the page
+    body_hits = classifier.body_hits(page)
+    is_18, adult_score = classifier.classify(tags, body_hits)
+
+    title = info['og_title']
+    title = title.replace("노벨피아 - ", "").split(" - ")[0] if title is not None else f"Novel_{novel_id}"
+
+    return "OK", {
+        'id': novel_id,
+        'title': title,
+        'author': "NPIA Scout",
+        'fav': fav,
+        'ep': ep,
+        'al': al,
+        'ratio': round(fav / ep, 2) if ep > 0 else 0,
+        'tags': tags,
+        'is_19': is_18,
+        'is_plus': 1 if info['has_plus'] else 0,
+        'url': url,
+        'adult_score': adult_score,
+        'adult_rules': classifier.version,
+        'adult_body': ",".join(sorted(body_hits)),
+    }
+
+
+def legacy_extract_page(page):
+    """Reference extractor: full BeautifulSoup parse, exactly as scrape_novel used to do it."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(page, 'lxml')
+    full_text = soup.get_text()
+    title_meta = soup.find("meta", property="og:title")
+    return {
+        'fav': _clean(FAV_RE.search(full_text)),
+        'ep': _clean(EP_RE.search(full_text)),
+        'al': _clean(AL_RE.search(full_text)),
+        'tags': ",".join(set(TAG_RE.findall(full_text))),
+        'og_title': title_meta.get("content", "Unknown") if title_meta else None,
+        'has_plus': "플러스" in page or "plus" in page.lower(),
+    }
+
+
+def compare_extractors(page):
+    """Field-by-field diff between the fast and legacy extractors ({} means parity)."""
+    fast, legacy = extract_page(page), legacy_extract_page(page)
+    # Tag order comes from a set, so compare tags as sets
+    fast['tags'] = set(filter(None, fast['tags'].split(',')))
+    legacy['tags'] = set(filter(None, legacy['tags'].split(',')))
+    return {k: (fast[k], legacy[k]) for k in fast if fast[k] != legacy[k]}
+
+
+if __name__ == "__main__":
+    # Parity check over saved pages: python -m core.extract data/fixtures
+    root = Path(sys.argv[1] if len(sys.argv) > 1 else "data/fixtures")
+    failures = 0
+    for path in sorted(root.glob("*.html")):
+        diff = compare_extractors(path.read_text(encoding="utf-8"))
+        print(f"{'OK  ' if not diff else 'DIFF'} {path.name} {diff or ''}")
+        failures += bool(diff)
+    sys.exit(1 if failures else 0)
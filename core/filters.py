@@ -1,3 +1,9 @@
+# ID-age tiers for is_high_quality: novels below OLD_ID_CUTOFF are held to the
+# higher bar. core/scoring.py applies the same thresholds vectorized.
+OLD_ID_CUTOFF = 300000
+OLD_MIN_VIEWS, OLD_MIN_CHAPTERS = 50000, 50
+NEW_MIN_VIEWS, NEW_MIN_CHAPTERS = 5000, 10
+
 def is_high_quality(metadata, novel_id):
     """
     Sliding scale filter: Older IDs require higher engagement.
@@ -9,8 +15,8 @@ def is_high_quality(metadata, novel_id):
     chapters = metadata.get('chapters', 0)
     
     # Thresholds: Older novels (ID < 300k) need higher stats
-    if nid < 300000:
-        return views > 50000 and chapters > 50
+    if nid < OLD_ID_CUTOFF:
+        return views > OLD_MIN_VIEWS and chapters > OLD_MIN_CHAPTERS
     else:
         # Newer novels are easier to archive
-        return views > 5000 and chapters > 10
+        return views > NEW_MIN_VIEWS and chapters > NEW_MIN_CHAPTERS
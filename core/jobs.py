@@ -0,0 +1,149 @@
+import os
+import threading
+import time
+
+from core.scanner import ScanEngine
+
+
+def outcome_of(result):
+    """'SUCCESS (18+: NO ...)' -> 'SUCCESS', 'ERR: timeout' -> 'ERR'."""
+    return result.split(" ", 1)[0].rstrip(":")
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, TypeError):
+        return pid is not None
+    return True
+
+
+class JobRunner:
+    """
+    Runs scan jobs on background threads, independent of any Streamlit session.
+    Progress is checkpointed to scan_jobs / scan_job_items every
+    `checkpoint_every` results or `checkpoint_interval` seconds, so a crash or a
+    browser refresh loses at most one checkpoint's worth of work.
+    """
+
+    def __init__(self, scraper, checkpoint_every=50, checkpoint_interval=2.0, on_progress=None,
+                 **engine_opts):
+        self.scraper = scraper
+        # Optional hook: on_progress(job_id, done, total, novel_id, result)
+        self.on_progress = on_progress
+        self.db = scraper.db
+        self.checkpoint_every = checkpoint_every
+        self.checkpoint_interval = checkpoint_interval
+        self.engine_opts = engine_opts
+        self._threads = {}
+        self._cancel = {}
+        self._lock = threading.Lock()
+        self.recover_interrupted()
+
+    def recover_interrupted(self):
+        """Jobs left 'running' by a dead process become resumable 'interrupted' jobs."""
+        for job in self.db.list_scan_jobs(limit=1000):
+            if job["status"] == "running" and not _pid_alive(job["worker_pid"]):
+                self.db.set_scan_job_status(job["job_id"], "interrupted")
+
+    def submit(self, start_id, end_id, concurrency=None, rate_limit=None, background=True):
+        """Creates a job for [start_id, end_id] and starts it. Returns the job id."""
+        job_id = self.db.create_scan_job(
+            start_id, end_id,
+            concurrency if concurrency is not None else self.engine_opts.get("concurrency"),
+            rate_limit if rate_limit is not None else self.engine_opts.get("rate_limit"),
+        )
+        self._launch(job_id, retry_failed=False, background=background)
+        return job_id
+
+    def resume(self, job_id, background=True):
+        """Continues a job from its checkpointed cursor."""
+        self._launch(job_id, retry_failed=False, background=background)
+
+    def retry_failed(self, job_id, background=True):
+        """Re-scans only the IDs whose last outcome was an error."""
+        self._launch(job_id, retry_failed=True, background=background)
+
+    def stop(self, job_id):
+        event = self._cancel.get(job_id)
+        if event:
+            event.set()
+
+    def is_running(self, job_id):
+        return job_id in self._cancel
+
+    def _launch(self, job_id, retry_failed, background):
+        with self._lock:
+            if job_id in self._cancel:
+                return  # already running
+            self._cancel[job_id] = threading.Event()
+        if not background:
+            return self._run(job_id, retry_failed)
+        thread = threading.Thread(target=self._run, args=(job_id, retry_failed),
+                                  name=f"scan-job-{job_id}", daemon=True)
+        self._threads[job_id] = thread
+        thread.start()
+
+    def _run(self, job_id, retry_failed):
+        job = self.db.get_scan_job(job_id)
+        if retry_failed:
+            ids = self.db.get_failed_job_ids(job_id)
+        else:
+            ids = range(job["cursor"] + 1, job["end_id"] + 1)
+
+        cancel = self._cancel[job_id]
+        opts = dict(self.engine_opts)
+        # The job's own settings win, so a resume runs the way it was launched
+        opts.update({key: job[key] for key in ("concurrency", "rate_limit") if job[key] is not None})
+        engine = ScanEngine(self.scraper, **opts)
+
+        buffer = []
+        state = {"cursor": None, "reported": 0, "contiguous": True, "flushed_at": time.monotonic()}
+
+        def checkpoint():
+            if buffer:
+                # Rows behind the cursor may still sit in the engine's write buffer;
+                # commit them first so a crash can't leave the cursor past unwritten IDs
+                engine.flush()
+                self.db.record_scan_job_items(job_id, buffer, state["cursor"])
+                buffer.clear()
+            state["flushed_at"] = time.monotonic()
+
+        def on_progress(done, total, nid, result):
+            buffer.append((nid, outcome_of(result), result))
+            # A skipped position is an ID a halted sweep never fetched; it has no
+            # result anywhere, so the cursor must not move past it
+            if done != state["reported"] + 1:
+                state["contiguous"] = False
+            state["reported"] = done
+            if not retry_failed and state["contiguous"]:
+                # Results arrive in ID order, so this is a safe resume point
+                state["cursor"] = nid
+            if self.on_progress:
+                self.on_progress(job_id, done, total, nid, result)
+            if (len(buffer) >= self.checkpoint_every
+                    or time.monotonic() - state["flushed_at"] >= self.checkpoint_interval):
+                checkpoint()
+
+        self.db.set_scan_job_status(job_id, "running", worker_pid=os.getpid())
+        try:
+            engine.run(ids, on_progress=on_progress,
+                       stop_on=lambda result: cancel.is_set() or "2FA" in result)
+            checkpoint()
+            if cancel.is_set():
+                self.db.set_scan_job_status(job_id, "stopped")
+            elif engine.aborted:
+                self.db.set_scan_job_status(job_id, "aborted", error=engine.aborted)
+            else:
+                self.db.set_scan_job_status(job_id, "done")
+        except Exception as e:
+            try:
+                checkpoint()
+            except Exception as flush_error:
+                # Rows didn't make it to disk: the cursor stays at the last good checkpoint
+                print(f"Checkpoint Error (job {job_id}): {flush_error}")
+            self.db.set_scan_job_status(job_id, "failed", error=str(e)[:200])
+        finally:
+            self._cancel.pop(job_id, None)
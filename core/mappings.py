@@ -1,3 +1,9 @@
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
 TAG_MAP = {
     # --- Major Genres ---
     "판타지": "Fantasy",
@@ -138,11 +144,114 @@ TAG_MAP = {
     "히어로": "Hero"
 }
 
-def translate_tags(tag_string):
+TAG_MAP_PATH = Path(__file__).resolve().parent.parent / "tag_map.json"
+
+class TagDictionary:
+    """
+    The one tag dictionary: built-in TAG_MAP overlaid with tag_map.json (file
+    entries win). Reloaded whenever the file's mtime changes, checked at most
+    every `check_interval` seconds; `version` is that mtime, so any process can
+    tell whether translations made with an older dictionary are stale.
+    """
+
+    def __init__(self, path=TAG_MAP_PATH, base=None, check_interval=1.0):
+        self.path = Path(path)
+        self.base = TAG_MAP if base is None else base
+        self.check_interval = check_interval
+        self.version = None
+        self._map = dict(self.base)
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def mapping(self):
+        if time.monotonic() - self._checked_at >= self.check_interval:
+            self._reload_if_changed()
+        return self._map
+
+    def get(self, tag, default=None):
+        return self.mapping().get(tag, default)
+
+    def __contains__(self, tag):
+        return tag in self.mapping()
+
+    def _mtime(self):
+        try:
+            return self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+
+    def _read_file(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _reload_if_changed(self):
+        with self._lock:
+            self._checked_at = time.monotonic()
+            mtime = self._mtime()
+            if mtime == self.version:
+                return
+            try:
+                entries = self._read_file()
+            except (OSError, ValueError) as e:
+                # Half-written or hand-broken file: keep serving the last good map
+                print(f"Tag Map Load Error: {e}")
+                return
+            self._map = {**self.base, **entries}
+            self.version = mtime
+
+    def update(self, entries):
+        """Adds/overwrites translations in tag_map.json (atomic replace) and reloads."""
+        entries = {k.strip(): v.strip() for k, v in entries.items() if k.strip() and v and v.strip()}
+        if not entries:
+            return 0
+        with self._lock:
+            merged = {**self._read_file(), **entries}
+            tmp = self.path.with_suffix(".json.tmp")
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(merged, f, ensure_ascii=False, indent=4)
+            os.replace(tmp, self.path)
+        self._checked_at = 0.0
+        self.mapping()
+        return len(entries)
+
+# Process-wide instance; Streamlit sessions and the scraper all read through it
+TAGS = TagDictionary()
+
+def translate_tags(tag_string, tag_map=None):
     """Translates a comma-separated string of Korean tags to English."""
     if not tag_string:
         return ""
+    tag_map = TAGS.mapping() if tag_map is None else tag_map
     tags = tag_string.split(',')
     # Use the map, fallback to original tag if translation is missing
-    translated = [TAG_MAP.get(t.strip(), t.strip()) for t in tags if t.strip()]
+    translated = [tag_map.get(t.strip(), t.strip()) for t in tags if t.strip()]
     return ", ".join(translated)
+
+def translate_tag_series(tags, tag_map=None):
+    """
+    translate_tags over a whole column (Series or list): each distinct tag string
+    is translated once, then broadcast back to the rows by factorized code.
+    """
+    import pandas as pd
+    tag_map = TAGS.mapping() if tag_map is None else tag_map
+    if not isinstance(tags, pd.Series):
+        tags = pd.Series(tags, dtype=object)
+    codes, uniques = pd.factorize(tags)
+    # Trailing "" is what code -1 (None/NaN) picks up from take()
+    english = pd.Series([translate_tags(t, tag_map) for t in uniques] + [""], dtype=object)
+    return pd.Series(english.values.take(codes), index=tags.index)
+
+def translate_tag_counts(counts, tag_map=None, missing="{}"):
+    """
+    {korean_tag: freq} -> DataFrame of English Tag / Freq, most frequent first.
+    Korean tags sharing a translation are summed; untranslated ones go through `missing`.
+    """
+    import pandas as pd
+    tag_map = TAGS.mapping() if tag_map is None else tag_map
+    korean = pd.Series(list(counts.keys()), dtype=object)
+    english = korean.map(tag_map).fillna(korean.map(missing.format))
+    freq = pd.Series(list(counts.values()), dtype="int64").groupby(english.values).sum()
+    return freq.rename_axis('Tag').reset_index(name='Freq').sort_values('Freq', ascending=False)
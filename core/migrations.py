@@ -0,0 +1,89 @@
+"""
+Versioned schema migrations, tracked in the file's PRAGMA user_version.
+
+NovelDB.MIGRATIONS lists the steps; NovelDB applies whatever is pending when it
+opens a vault. To check or upgrade a production file by hand:
+
+    python -m core.migrations npia_scout.db --status
+    python -m core.migrations npia_scout.db --backup npia_scout.bak.db
+"""
+import argparse
+import sqlite3
+import sys
+
+
+def current_version(conn):
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def add_column(conn, table, column, decl):
+    """
+    ALTER TABLE ... ADD COLUMN unless it already exists. ADD COLUMN only edits the
+    schema, so it's instant even on big tables. The existence check covers vaults
+    that got the column from the ad hoc migrations before user_version was tracked.
+    """
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in existing:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+def migrate(conn, steps):
+    """
+    Applies pending (version, description, fn(conn)) steps in version order. Each
+    step and its user_version bump share one BEGIN IMMEDIATE transaction, so a
+    failing step leaves the file at the previous version. The version is re-read
+    under the write lock, so two processes opening the same file don't double-apply.
+    Returns the versions applied.
+    """
+    applied = []
+    for version, description, fn in sorted(steps, key=lambda s: s[0]):
+        if current_version(conn) >= version:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if current_version(conn) < version:
+                fn(conn)
+                conn.execute(f"PRAGMA user_version = {int(version)}")
+                applied.append(version)
+            conn.commit()
+        except Exception as e:
+            conn.rollback()
+            raise RuntimeError(f"Migration {version} ({description}) failed: {e}") from e
+    if applied:
+        # New indexes are only useful once the planner has stats for them
+        conn.execute("PRAGMA optimize")
+    return applied
+
+
+def main(argv=None):
+    from core.database import NovelDB
+
+    ap = argparse.ArgumentParser(description="Show or apply pending NovelDB schema migrations")
+    ap.add_argument("db", nargs="?", default="npia_scout.db")
+    ap.add_argument("--status", action="store_true", help="list pending steps without applying them")
+    ap.add_argument("--backup", help="copy the file here (online backup API) before migrating")
+    args = ap.parse_args(argv)
+
+    conn = sqlite3.connect(args.db)
+    version = current_version(conn)
+    pending = [(v, d) for v, d, _ in NovelDB.MIGRATIONS if v > version]
+    print(f"{args.db}: schema version {version}, {len(pending)} pending")
+    for v, d in pending:
+        print(f"  {v:>3}  {d}")
+    if args.status or not pending:
+        conn.close()
+        return 0
+    if args.backup:
+        with sqlite3.connect(args.backup) as dest:
+            conn.backup(dest)
+        print(f"Backed up to {args.backup}")
+    conn.close()
+
+    db = NovelDB(args.db)
+    print(f"Now at schema version {db.schema_version()}")
+    db.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+
+class ConnectionPool:
+    """
+    Per-thread read connections plus one shared writer connection.
+    WAL lets the dashboard keep reading while the scanner writes, so only
+    writes are serialized (behind `_write_lock`).
+    """
+
+    # Applied once when a connection is opened, never per query
+    PRAGMAS = (
+        "PRAGMA synchronous=NORMAL",
+        "PRAGMA mmap_size=268435456",   # 256 MB
+        "PRAGMA cache_size=-65536",     # 64 MB
+        "PRAGMA temp_store=MEMORY",
+        "PRAGMA foreign_keys=ON",
+    )
+
+    def __init__(self, db_path, timeout=30):
+        self.db_path = db_path
+        self.timeout = timeout
+        self._readers = {}  # thread ident -> connection
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        self._writer = None
+
+    def _open(self):
+        # check_same_thread=False is essential for Streamlit's multi-threaded nature
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, timeout=self.timeout)
+        for pragma in self.PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def reader(self):
+        ident = threading.get_ident()
+        conn = self._readers.get(ident)
+        if conn is None:
+            conn = self._open()
+            with self._readers_lock:
+                self._prune_dead_threads()
+                self._readers[ident] = conn
+        return conn
+
+    def _prune_dead_threads(self):
+        # Streamlit spins up fresh script threads; drop connections they left behind
+        alive = {t.ident for t in threading.enumerate()}
+        for ident in [i for i in self._readers if i not in alive]:
+            self._readers.pop(ident).close()
+
+    @contextmanager
+    def writer(self):
+        """Serialized write transaction: commits on success, rolls back on error."""
+        with self._write_lock:
+            if self._writer is None:
+                self._writer = self._open()
+                # Persistent on the file, so setting it once is enough
+                self._writer.execute("PRAGMA journal_mode=WAL")
+            try:
+                yield self._writer
+                self._writer.commit()
+            except Exception:
+                self._writer.rollback()
+                raise
+
+    def close(self):
+        with self._readers_lock:
+            for conn in self._readers.values():
+                conn.close()
+            self._readers.clear()
+        with self._write_lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
@@ -0,0 +1,42 @@
+class RefreshPlanner:
+    """
+    Picks which vaulted novels to re-scrape within a request budget.
+
+    Priority = days since last scrape * (1 + velocity_weight * relative growth),
+    where relative growth is favs gained per day as a % of current favs. Stale
+    novels that are still growing float to the top; frozen ones only come
+    back once they are very old. Novels scraped once have no velocity yet and
+    are assumed to grow at `default_growth` %/day so they still get sampled.
+    Novels whose last re-scrape got them blacklisted (404, LOW_SIGNAL) are left
+    to the blacklist's own re-probe schedule.
+    """
+
+    def __init__(self, db, budget=500, min_age_days=1.0, velocity_weight=1.0, default_growth=1.0):
+        self.db = db
+        self.budget = budget
+        self.min_age_days = min_age_days
+        self.velocity_weight = velocity_weight
+        self.default_growth = default_growth
+
+    def candidates(self, limit=None):
+        """Top rows by priority: (novel_id, age_days, fav, fav_velocity, priority)."""
+        cursor = self.db.get_connection().execute("""
+            SELECT novel_id, age_days, fav, fav_velocity,
+                   age_days * (1 + ? * MAX(COALESCE(100.0 * fav_velocity / (fav + 10), ?), 0)) AS priority
+            FROM (
+                SELECT novel_id, fav, fav_velocity,
+                       julianday('now', 'localtime') - julianday(last_updated) AS age_days
+                FROM valid_novels v
+                WHERE last_updated <= datetime('now', 'localtime', ?)
+                  -- a failed refresh never moves last_updated, so without this dead novels top every plan
+                  AND NOT EXISTS (SELECT 1 FROM blacklist b WHERE b.novel_id = v.novel_id)
+            )
+            ORDER BY priority DESC
+            LIMIT ?
+        """, (self.velocity_weight, self.default_growth,
+              f"-{self.min_age_days * 24:.3f} hours", limit or self.budget))
+        return cursor.fetchall()
+
+    def plan(self):
+        """IDs to re-fetch this run, highest priority first."""
+        return [row[0] for row in self.candidates()]
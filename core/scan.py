@@ -0,0 +1,205 @@
+"""
+Headless scanner for cron/systemd.
+
+    python -m core.scan --start 383000 --end 393000 --concurrency 32 --rate 10
+    python -m core.scan --resume 7
+    python -m core.scan --retry-failed 7
+    python -m core.scan --follow --window 200 --poll-interval 300
+    python -m core.scan --refresh 500
+    python -m core.scan --reprobe 1000
+
+Sweeps run as checkpointed scan jobs, so a killed process can be resumed with
+--resume. --follow keeps probing the IDs just above the highest vaulted
+novel_id and advances as new novels are published. --refresh re-scrapes the
+stalest, fastest-growing vaulted novels within a request budget, and
+--reprobe retries blacklisted IDs whose re-probe time has come. Progress is
+logged as one JSON object per line.
+"""
+import argparse
+import json
+import logging
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from core.database import NovelDB
+from core.jobs import JobRunner, outcome_of
+from core.refresh import RefreshPlanner
+from core.scanner import ScanEngine
+from core.scraper import NovelpiaScraper
+
+log = logging.getLogger("npia.scan")
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        payload = {
+            "ts": datetime.fromtimestamp(record.created).isoformat(timespec="seconds"),
+            "level": record.levelname.lower(),
+            "event": record.getMessage(),
+        }
+        payload.update(getattr(record, "fields", {}))
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+def emit(event, level=logging.INFO, **fields):
+    log.log(level, event, extra={"fields": fields})
+
+
+class ProgressLogger:
+    """Throttled progress lines plus a per-outcome tally."""
+
+    def __init__(self, every=100, interval=10.0):
+        self.every = every
+        self.interval = interval
+        self.counts = {}
+        self.started_at = self.logged_at = time.monotonic()
+
+    def __call__(self, job_id, done, total, nid, result):
+        outcome = outcome_of(result)
+        self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        emit("result", logging.DEBUG, job_id=job_id, novel_id=nid, result=result)
+        now = time.monotonic()
+        if done == total or done % self.every == 0 or now - self.logged_at >= self.interval:
+            self.logged_at = now
+            elapsed = now - self.started_at
+            emit("progress", job_id=job_id, done=done, total=total, last_id=nid,
+                 ids_per_sec=round(done / elapsed, 1) if elapsed else None, outcomes=dict(self.counts))
+
+
+def run_job(runner, db, job_id, retry_failed, stop):
+    emit("job_start", job_id=job_id, retry_failed=retry_failed, **_job_fields(db, job_id))
+    watcher = threading.Thread(target=lambda: stop.wait() and runner.stop(job_id), daemon=True)
+    watcher.start()
+    if retry_failed:
+        runner.retry_failed(job_id, background=False)
+    else:
+        runner.resume(job_id, background=False)
+    job = db.get_scan_job(job_id)
+    emit("job_end", job_id=job_id, status=job["status"], cursor=job["cursor"], error=job["error"])
+    return job["status"] in ("done", "stopped")
+
+
+def _job_fields(db, job_id):
+    job = db.get_scan_job(job_id)
+    if job is None:
+        raise SystemExit(f"No scan job #{job_id}")
+    return {"start_id": job["start_id"], "end_id": job["end_id"], "cursor": job["cursor"]}
+
+
+def follow(engine, db, start, window, poll_interval, stop):
+    """
+    Probes [frontier+1, frontier+window] over and over. IDs above the frontier
+    are re-fetched even if blacklisted, because a 404 there usually just means
+    "not published yet".
+    """
+    frontier = db.get_max_novel_id() or start or 0
+    if start:
+        frontier = max(frontier, start - 1)
+    emit("follow_start", frontier=frontier, window=window, poll_interval=poll_interval)
+
+    while not stop.is_set():
+        lo, hi = frontier + 1, frontier + window
+        vaulted = db.get_known_ids(lo, hi, include_blacklist=False)
+        ids = [nid for nid in range(lo, hi + 1) if nid not in vaulted]
+        results = engine.run(ids, stop_on=lambda _: stop.is_set(), skip_known=False)
+
+        found = [int(nid) for nid, res in results.items() if res.startswith("SUCCESS")]
+        new_frontier = max([frontier, *found, db.get_max_novel_id() or 0])
+        emit("follow_probe", low=lo, high=hi, probed=len(results), found=len(found),
+             frontier=new_frontier, aborted=engine.aborted, throttle=engine.stats().get("throttle"))
+
+        if engine.aborted and engine.aborted != "stop condition":
+            # Breaker exhausted: back off a full poll interval before trying again
+            stop.wait(poll_interval)
+        elif new_frontier == frontier:
+            stop.wait(poll_interval)
+        frontier = new_frontier
+    emit("follow_stop", frontier=frontier)
+
+
+def refresh(engine, db, budget, stop):
+    ids = RefreshPlanner(db, budget=budget).plan()
+    emit("refresh_start", planned=len(ids), budget=budget)
+    progress = ProgressLogger()
+    results = engine.run(ids, skip_known=False, stop_on=lambda _: stop.is_set(),
+                         on_progress=lambda done, total, nid, res: progress(None, done, total, nid, res))
+    emit("refresh_end", refreshed=len(results), outcomes=progress.counts, aborted=engine.aborted)
+    return not engine.aborted or engine.aborted == "stop condition"
+
+
+def reprobe(engine, db, limit, stop):
+    ids = db.get_reprobe_ids(limit)
+    emit("reprobe_start", due=len(ids), limit=limit, blacklist=db.get_blacklist_summary())
+    progress = ProgressLogger()
+    results = engine.run(ids, stop_on=lambda _: stop.is_set(),
+                         on_progress=lambda done, total, nid, res: progress(None, done, total, nid, res))
+    emit("reprobe_end", probed=len(results), outcomes=progress.counts, aborted=engine.aborted)
+    return not engine.aborted or engine.aborted == "stop condition"
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Headless Novelpia ID scanner")
+    ap.add_argument("--start", type=int, help="first ID of a new sweep (or the --follow floor)")
+    ap.add_argument("--end", type=int, help="last ID of a new sweep")
+    target = ap.add_mutually_exclusive_group()
+    target.add_argument("--resume", type=int, metavar="JOB_ID", help="resume a checkpointed job")
+    target.add_argument("--retry-failed", type=int, metavar="JOB_ID", help="re-scan a job's failed IDs")
+    target.add_argument("--follow", action="store_true", help="keep scanning above the newest known ID")
+    target.add_argument("--refresh", type=int, metavar="BUDGET", help="re-scrape up to BUDGET stale novels")
+    target.add_argument("--reprobe", type=int, metavar="LIMIT", help="re-probe up to LIMIT due blacklist IDs")
+    ap.add_argument("--db", default="npia_scout.db")
+    ap.add_argument("--base-url", default=None, help="override the novel page prefix (e.g. a mirror)")
+    ap.add_argument("--concurrency", type=int, default=16)
+    ap.add_argument("--rate", type=float, default=8.0, help="starting req/sec")
+    ap.add_argument("--max-rate", type=float, default=None, help="AIMD ceiling (defaults to --rate)")
+    ap.add_argument("--parse-processes", type=int, default=0)
+    ap.add_argument("--window", type=int, default=200, help="IDs probed per --follow round")
+    ap.add_argument("--poll-interval", type=float, default=300.0, help="seconds between idle --follow rounds")
+    ap.add_argument("--verbose", action="store_true", help="log every result, not just progress")
+    args = ap.parse_args(argv)
+
+    new_sweep = (args.resume is None and args.retry_failed is None and args.refresh is None
+                 and args.reprobe is None and not args.follow)
+    if new_sweep and (args.start is None or args.end is None):
+        ap.error("a new sweep needs --start and --end (or use --resume/--retry-failed/--follow)")
+
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(JsonFormatter())
+    log.addHandler(handler)
+    log.setLevel(logging.DEBUG if args.verbose else logging.INFO)
+
+    stop = threading.Event()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        signal.signal(sig, lambda signum, _frame: (emit("signal", signum=signum), stop.set()))
+
+    db = NovelDB(args.db)
+    engine_opts = dict(concurrency=args.concurrency, rate_limit=args.rate, max_rate=args.max_rate,
+                       parse_processes=args.parse_processes)
+    ok = True
+    with NovelpiaScraper(db) as scraper:
+        if args.base_url:
+            scraper.base_url = args.base_url
+        if args.follow:
+            follow(ScanEngine(scraper, **engine_opts), db, args.start, args.window, args.poll_interval, stop)
+        elif args.refresh is not None:
+            ok = refresh(ScanEngine(scraper, **engine_opts), db, args.refresh, stop)
+        elif args.reprobe is not None:
+            ok = reprobe(ScanEngine(scraper, **engine_opts), db, args.reprobe, stop)
+        else:
+            runner = JobRunner(scraper, on_progress=ProgressLogger(), **engine_opts)
+            if args.resume is not None:
+                job_id, retry = args.resume, False
+            elif args.retry_failed is not None:
+                job_id, retry = args.retry_failed, True
+            else:
+                job_id, retry = db.create_scan_job(args.start, args.end, args.concurrency, args.rate), False
+            ok = run_job(runner, db, job_id, retry, stop)
+    db.close()
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,329 @@
+import asyncio
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from core.extract import parse_novel
+from core.throttle import (
+    TRANSIENT_ERRORS, AdaptiveRateLimiter, CircuitBreaker, RetryScheduler,
+    is_transient_status, retry_after_seconds,
+)
+from core.writer import BatchWriter
+
+_DONE = object()  # end-of-stream marker passed between stages
+
+
+async def _run_stages(tasks):
+    """
+    Waits for every pipeline task. The first one to fail (e.g. on_progress raising
+    Streamlit's rerun out of persist) cancels the rest and its error is re-raised;
+    otherwise the other stages would block forever on queues nobody drains.
+    """
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_EXCEPTION)
+    finally:
+        running = {t for t in tasks if not t.done()}
+        while running:
+            # Re-cancel: a cancel landing mid-request can be swallowed by the HTTP
+            # client, leaving that fetcher to block on the full parse queue
+            for t in running:
+                t.cancel()
+            _, running = await asyncio.wait(running, timeout=0.1)
+    for t in tasks:
+        if t in done and not t.cancelled() and t.exception() is not None:
+            raise t.exception()
+
+
+class StageStats:
+    """
+    Throughput and queue-depth counters for one pipeline stage. Latency
+    percentiles cover the last `window` items, so memory stays flat on long
+    --follow runs and stats() sorts a fixed-size list however often it's polled.
+    """
+
+    def __init__(self, name, queue=None, window=2048):
+        self.name = name
+        self.queue = queue
+        self.items = 0
+        self.busy = 0.0  # seconds spent working, summed over the stage's workers
+        self.max_depth = 0
+        self.samples = deque(maxlen=window)
+
+    def record(self, seconds):
+        self.items += 1
+        self.busy += seconds
+        self.samples.append(seconds)
+        if self.queue is not None:
+            self.max_depth = max(self.max_depth, self.queue.qsize())
+
+    def percentile(self, q):
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(int(q * len(ordered)), len(ordered) - 1)]
+
+    def snapshot(self, elapsed):
+        return {
+            "items": self.items,
+            "items_per_sec": round(self.items / elapsed, 1) if elapsed else 0.0,
+            "avg_ms": round(1000 * self.busy / self.items, 2) if self.items else 0.0,
+            "p50_ms": round(1000 * self.percentile(0.50), 2),
+            "p95_ms": round(1000 * self.percentile(0.95), 2),
+            "queue_depth": self.queue.qsize() if self.queue is not None else 0,
+            "max_queue_depth": self.max_depth,
+        }
+
+
+class ScanEngine:
+    """
+    Concurrent ID-range sweeper built as a three-stage pipeline:
+
+        fetch (httpx.AsyncClient) -> parse (ProcessPoolExecutor) -> persist (BatchWriter)
+
+    Stages are linked by bounded queues, so a slow parser or disk back-pressures
+    the fetchers instead of buffering the whole sweep in memory.
+    Results keep the scraper's SUCCESS/BLACKLISTED/SKIPPED strings and are
+    reported back in ID order, so a progress bar never jumps backwards.
+
+    Transient failures (429/5xx/timeouts) are retried with jittered exponential
+    backoff, the request rate adapts AIMD-style between `rate_limit` and
+    `max_rate`, and a circuit breaker pauses, then aborts, on sustained errors.
+    """
+
+    def __init__(self, scraper, concurrency=16, rate_limit=8.0, batch_size=200, flush_interval=1.0,
+                 parse_processes=0, queue_size=64, max_rate=None, max_attempts=4,
+                 retry_base_delay=1.0, breaker_cooldown=30.0):
+        self.scraper = scraper
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+        self.max_rate = max_rate
+        self.max_attempts = max_attempts
+        self.retry_base_delay = retry_base_delay
+        self.breaker_cooldown = breaker_cooldown
+        self.aborted = None  # reason the last sweep stopped early, if any
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        # 0 parses inline on the event loop; >0 spreads parsing across processes
+        self.parse_processes = parse_processes
+        self.queue_size = queue_size
+        self.write_stats = {}
+        self.stage_stats = {}
+        self._writer = None
+
+    def run(self, ids, on_progress=None, stop_on=None, skip_known=True):
+        """
+        Blocking entry point for Streamlit / scripts.
+        on_progress(done, total, novel_id, result) is called in ID order; when a
+        halted sweep drops IDs it never fetched, `done` jumps over their positions.
+        stop_on(result) -> True aborts the sweep (e.g. a 2FA wall).
+        skip_known=False re-fetches IDs already in the vault or blacklist.
+        """
+        return asyncio.run(self.scan(ids, on_progress, stop_on, skip_known))
+
+    def flush(self):
+        """Commits every row the current sweep has reported so far (blocks until written)."""
+        if self._writer is not None:
+            self._writer.flush()
+
+    def stats(self):
+        """Per-stage throughput/queue depths of the current or last sweep, plus writer metrics."""
+        elapsed = (self._finished_at or time.monotonic()) - self._started_at if self.stage_stats else 0
+        out = {name: st.snapshot(elapsed) for name, st in self.stage_stats.items()}
+        out["writer"] = self.write_stats
+        if self.stage_stats:
+            out["throttle"] = {
+                "rate": round(self.limiter.rate, 2),
+                "throttled": self.limiter.throttled,
+                "retried": self.retries.retried,
+                "gave_up": self.retries.gave_up,
+                "breaker": self.breaker.state,
+                "breaker_trips": self.breaker.trips,
+            }
+        return out
+
+    async def scan(self, ids, on_progress=None, stop_on=None, skip_known=True):
+        ids = [int(nid) for nid in ids]
+        total = len(ids)
+        results = {}
+        if not total:
+            return results
+
+        # One range query instead of a check_exists round-trip per ID
+        known = self.scraper.db.get_known_ids(min(ids), max(ids)) if skip_known else set()
+
+        pending = {}
+        todo = asyncio.Queue()
+        for i, nid in enumerate(ids):
+            if nid in known:
+                pending[i] = (str(nid), "SKIPPED (Existing)")
+            else:
+                todo.put_nowait((i, str(nid)))
+        outstanding = todo.qsize()  # IDs still to fetch, including ones waiting on a retry
+
+        parse_q = asyncio.Queue(maxsize=self.queue_size)
+        persist_q = asyncio.Queue(maxsize=self.queue_size)
+        fetch_stats = StageStats("fetch", todo)
+        parse_stats = StageStats("parse", parse_q)
+        persist_stats = StageStats("persist", persist_q)
+        self.stage_stats = {"fetch": fetch_stats, "parse": parse_stats, "persist": persist_stats}
+        self._started_at, self._finished_at = time.monotonic(), None
+
+        limiter = self.limiter = AdaptiveRateLimiter(self.rate_limit, max_rate=self.max_rate)
+        retries = self.retries = RetryScheduler(self.max_attempts, self.retry_base_delay)
+        breaker = self.breaker = CircuitBreaker(cooldown=self.breaker_cooldown)
+        self.aborted = None
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        scraper = self.scraper
+        # Long-lived scrapers pick up a rule set switched since the last sweep
+        scraper.refresh_classifier()
+        n_parsers = max(self.parse_processes, 1)
+        cursor = 0  # next index to report, keeps progress ordered
+
+        def drain(cursor):
+            # Report every finished result that is next in ID order
+            while cursor in pending:
+                nid, result = pending.pop(cursor)
+                cursor += 1
+                if result is None:
+                    continue
+                results[nid] = result
+                if on_progress:
+                    on_progress(cursor, total, nid, result)
+            return cursor
+
+        def halt(reason=None):
+            if stop.is_set():
+                return
+            stop.set()
+            self.aborted = reason
+            for _ in range(self.concurrency):
+                todo.put_nowait(_DONE)
+
+        async def fetcher(client):
+            nonlocal outstanding
+            while (entry := await todo.get()) is not _DONE:
+                if stop.is_set():
+                    continue
+                await breaker.wait()
+                if breaker.exhausted:
+                    halt("circuit breaker open")
+                    continue
+
+                idx, nid = entry
+                await limiter.wait()
+                t0 = time.monotonic()
+                url = f"{scraper.base_url}{nid}"
+                error = retry_after = None
+                ok = True
+                try:
+                    resp = await client.get(url)
+                except TRANSIENT_ERRORS as e:
+                    error = type(e).__name__
+                except Exception as e:
+                    # Not worth retrying (bad URL, redirect loop), but still a failed request
+                    ok = False
+                    item = (idx, nid, f"ERR: {str(e)[:20]}")
+                else:
+                    if is_transient_status(resp.status_code):
+                        error = f"HTTP {resp.status_code}"
+                        retry_after = retry_after_seconds(resp)
+                        if resp.status_code in (429, 503):
+                            limiter.on_throttle(retry_after)
+                    else:
+                        limiter.on_success(time.monotonic() - t0)
+                        item = (idx, nid, url, resp.status_code, resp.text)
+                breaker.record(ok and error is None)
+                fetch_stats.record(time.monotonic() - t0)
+
+                if error:
+                    delay = retries.next_delay(nid, error, retry_after)
+                    if delay is not None:
+                        loop.call_later(delay, todo.put_nowait, entry)
+                        continue
+                    item = (idx, nid, f"ERR: {error[:20]}")
+                retries.done(nid)
+                outstanding -= 1
+                if not outstanding:
+                    halt()
+                await parse_q.put(item)
+
+        async def parser(pool):
+            while (item := await parse_q.get()) is not _DONE:
+                t0 = time.monotonic()
+                if len(item) == 3:  # fetch error, nothing to parse
+                    await persist_q.put(item)
+                    continue
+                idx, nid, url, status, text = item
+                args = (nid, url, status, text, scraper.classifier, scraper.fast_parse)
+                try:
+                    if pool is None:
+                        verdict = parse_novel(*args)
+                    else:
+                        verdict = await loop.run_in_executor(pool, parse_novel, *args)
+                    out = (idx, nid, verdict)
+                except Exception as e:
+                    out = (idx, nid, f"ERR: {str(e)[:20]}")
+                parse_stats.record(time.monotonic() - t0)
+                await persist_q.put(out)
+            await persist_q.put(_DONE)
+
+        async def persister(writer):
+            nonlocal cursor
+            remaining = n_parsers
+            while remaining:
+                item = await persist_q.get()
+                if item is _DONE:
+                    remaining -= 1
+                    continue
+                t0 = time.monotonic()
+                idx, nid, outcome = item
+                if isinstance(outcome, str):
+                    result = outcome
+                else:
+                    try:
+                        result = scraper.persist(nid, *outcome, sink=writer)
+                    except Exception as e:
+                        result = f"ERR: {str(e)[:20]}"
+                persist_stats.record(time.monotonic() - t0)
+                pending[idx] = (nid, result)
+                if stop_on and stop_on(result):
+                    halt("stop condition")
+                cursor = drain(cursor)
+
+        pool = ProcessPoolExecutor(self.parse_processes) if self.parse_processes else None
+        writer = self._writer = BatchWriter(scraper.db, self.batch_size, self.flush_interval)
+        try:
+            cursor = drain(cursor)
+            if not outstanding:
+                halt()
+            async with scraper.build_async_client(pool_size=self.concurrency) as client:
+                fetch_tasks = [asyncio.create_task(fetcher(client)) for _ in range(self.concurrency)]
+
+                async def end_parsing():
+                    await asyncio.gather(*fetch_tasks)
+                    for _ in range(n_parsers):
+                        await parse_q.put(_DONE)
+
+                await _run_stages([
+                    asyncio.create_task(persister(writer)),
+                    *(asyncio.create_task(parser(pool)) for _ in range(n_parsers)),
+                    *fetch_tasks,
+                    asyncio.create_task(end_parsing()),
+                ])
+
+            # IDs never fetched because the sweep was halted are dropped from the report
+            for idx in range(cursor, total):
+                pending.setdefault(idx, (None, None))
+            drain(cursor)
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+            # Nothing leaves the sweep unwritten, even on abort (close raises if rows couldn't be written)
+            try:
+                writer.close()
+            finally:
+                self.write_stats = writer.stats()
+                self._finished_at = time.monotonic()
+
+        return results
@@ -0,0 +1,117 @@
+"""
+Sleeper scoring over the whole vault, vectorized with NumPy/pandas.
+
+Each novel gets four components in [0, 1]:
+    ratio    percentile of fav / ep (recomputed, not the rounded DB column)
+    alarm    percentile of al / ep, i.e. readers waiting on the next episode
+    growth   percentile of favs gained per day (snapshots, else fav_velocity)
+    quality  1 if it clears the ID-age thresholds of filters.is_high_quality;
+             unknown (NaN) without a view count, which scraped novels never have
+The score is the weighted mean of each novel's known components. Components are
+cached per vault data version, so changing weights is just a matrix-vector
+product over the cached frame.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from core.filters import (
+    NEW_MIN_CHAPTERS, NEW_MIN_VIEWS, OLD_ID_CUTOFF, OLD_MIN_CHAPTERS, OLD_MIN_VIEWS,
+)
+
+COMPONENTS = ("ratio", "alarm", "growth", "quality")
+DEFAULT_WEIGHTS = {"ratio": 1.0, "alarm": 0.5, "growth": 1.0, "quality": 0.5}
+
+
+def high_quality_mask(novel_ids, views, chapters):
+    """is_high_quality for whole arrays at once (NaN stats fail the check)."""
+    novel_ids, views, chapters = (np.asarray(a, dtype=float) for a in (novel_ids, views, chapters))
+    old = novel_ids < OLD_ID_CUTOFF
+    return np.where(old,
+                    (views > OLD_MIN_VIEWS) & (chapters > OLD_MIN_CHAPTERS),
+                    (views > NEW_MIN_VIEWS) & (chapters > NEW_MIN_CHAPTERS))
+
+
+def load_frame(db, growth_days=7):
+    df = pd.read_sql("""
+        SELECT novel_id, title, fav, ep, al, views, fav_velocity, tags_en, is_19, is_plus, url
+        FROM valid_novels
+    """, db.get_connection())
+    growth = pd.DataFrame(db.get_fav_growth(growth_days), columns=["novel_id", "fav_gain", "growth"])
+    return df.merge(growth, on="novel_id", how="left")
+
+
+def compute_components(df):
+    """Adds the raw metrics and the four 0-1 components as columns (no per-row Python)."""
+    fav = df["fav"].to_numpy(dtype=float)
+    ep = df["ep"].to_numpy(dtype=float)
+    ep = np.where(ep > 0, ep, np.nan)
+    out = df.copy()
+    out["ratio_raw"] = fav / ep
+    out["alarm_raw"] = df["al"].to_numpy(dtype=float) / ep
+    out["growth_raw"] = df["growth"].fillna(df["fav_velocity"]).to_numpy(dtype=float)
+    # The gate is defined on views; favs are a small fraction of those, so rows
+    # without a view count are unknown here rather than failed
+    views = df["views"].to_numpy(dtype=float)
+    out["quality"] = np.where(np.isnan(views), np.nan,
+                              high_quality_mask(df["novel_id"], views, df["ep"]).astype(float))
+    for name in ("ratio", "alarm", "growth"):
+        # Unknown metrics (legacy rows without favs, no history yet) rank last
+        out[name] = out[f"{name}_raw"].rank(pct=True).fillna(0.0)
+    return out
+
+
+def score(frame, weights=None):
+    """
+    Weighted mean of each row's known components (NaN ones drop out of both the
+    sum and the weight total); weights may omit components (weight 0).
+    """
+    weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+    w = np.array([max(float(weights[c]), 0.0) for c in COMPONENTS])
+    values = frame[list(COMPONENTS)].to_numpy(dtype=float)
+    known = ~np.isnan(values)
+    total = known @ w
+    weighted = np.where(known, values, 0.0) @ w
+    return np.divide(weighted, total, out=np.zeros(len(frame)), where=total > 0)
+
+
+class VaultScorer:
+    """
+    Component frame cached per (vault data version, growth window); any number
+    of re-rankings with different weights reuse it without touching SQLite.
+    """
+
+    def __init__(self, db, growth_days=7):
+        self.db = db
+        self.growth_days = growth_days
+        self._key = None
+        self._frame = None
+        self._lock = threading.Lock()
+
+    def components(self, growth_days=None):
+        days = growth_days or self.growth_days
+        key = (self.db.get_data_version(), days)
+        with self._lock:
+            if key != self._key:
+                self._frame = compute_components(load_frame(self.db, days))
+                self._key = key
+            return self._frame
+
+    def rank(self, weights=None, top=100, plus_only=False, adult_only=False, growth_days=None):
+        """Top `top` novels by score, best first, with their components."""
+        frame = self.components(growth_days)
+        if plus_only:
+            frame = frame[frame["is_plus"] == 1]
+        if adult_only:
+            frame = frame[frame["is_19"] == 1]
+        scores = score(frame, weights)
+        if top and len(scores) > top:
+            # O(n) selection of the top rows, then sort just those
+            idx = np.argpartition(-scores, top - 1)[:top]
+        else:
+            idx = np.arange(len(scores))
+        idx = idx[np.argsort(-scores[idx], kind="stable")]
+        ranked = frame.iloc[idx].copy()
+        ranked.insert(1, "score", scores[idx].round(4))
+        return ranked
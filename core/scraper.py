@@ -1,88 +1,109 @@
 import httpx
-from bs4 import BeautifulSoup
-import re
+import importlib.util
 from datetime import datetime
+from core.classify import get_classifier
+from core.extract import parse_novel
+from core.throttle import is_transient_status
+
+# HTTP/2 needs the optional `h2` package (pip install httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
 
 class NovelpiaScraper:
-    def __init__(self, db_manager):
+    def __init__(self, db_manager, pool_size=20, keepalive_expiry=30.0, http2=None, fast_parse=True,
+                 classifier=None):
         self.db = db_manager
+        # Regex extraction over the raw page; False falls back to the full BeautifulSoup parse
+        self.fast_parse = fast_parse
         self.base_url = "https://novelpia.com/novel/"
+        self.pool_size = pool_size
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._client = None
         
-        # Dead giveaway tags for 18+ classification based on your focus
-        self.ADULT_RED_FLAGS = [
-            "ntl", "ntr", "고수위", "조교", "능욕", "최면", 
-            "관음", "역강간", "촉수", "근친", "절륜", "성인"
-        ]
+        # 18+ rules (red-flag tags, body markers); see core/classify.py. Unless one is
+        # pinned here, it follows the vault's active rule set (refresh_classifier)
+        self._pinned_classifier = classifier is not None
+        self.classifier = classifier or db_manager.adult_classifier()
         
         self.headers = {
             "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) Chrome/121.0.0.0",
             "Accept-Language": "ko-KR,ko;q=0.9",
         }
 
-    def _extract_stats_and_tags(self, soup):
-        full_text = soup.get_text()
-        
-        fav_m = re.search(r'선호\s*[:：]?\s*([\d,]+)', full_text)
-        ep_m = re.search(r'회차\s*[:：]?\s*([\d,]+)', full_text)
-        al_m = re.search(r'알람\s*[:：]?\s*([\d,]+)', full_text)
-        
-        def clean(m):
-            return int(m.group(1).replace(',', '')) if m else 0
+    def _limits(self, pool_size=None):
+        size = pool_size or self.pool_size
+        return httpx.Limits(max_connections=size, max_keepalive_connections=size,
+                            keepalive_expiry=self.keepalive_expiry)
 
-        tags_found = re.findall(r'#([가-힣a-zA-Z0-9]+)', full_text)
-        tags_str = ",".join(list(set(tags_found)))
+    @property
+    def client(self):
+        """Long-lived pooled client, so keep-alive connections survive between novels."""
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.Client(headers=self.headers, follow_redirects=True,
+                                        http2=self.http2, limits=self._limits(), timeout=10.0)
+        return self._client
 
-        return clean(fav_m), clean(ep_m), clean(al_m), tags_str
+    def build_async_client(self, pool_size=None):
+        """AsyncClient with the same headers/pool settings; the caller owns its lifecycle."""
+        return httpx.AsyncClient(headers=self.headers, follow_redirects=True,
+                                 http2=self.http2, limits=self._limits(pool_size), timeout=10.0)
 
-    def scrape_novel(self, novel_id):
-        if self.db.check_exists(novel_id):
-            return "SKIPPED (Existing)"
+    def close(self):
+        if self._client is not None:
+            self._client.close()
+            self._client = None
 
-        url = f"{self.base_url}{novel_id}"
-        try:
-            with httpx.Client(headers=self.headers, follow_redirects=True) as client:
-                resp = client.get(url, timeout=10.0)
-                
-                if resp.status_code == 404:
-                    self.db.add_to_blacklist(novel_id, "404")
-                    return "BLACKLISTED (404)"
+    def __enter__(self):
+        return self
 
-                soup = BeautifulSoup(resp.text, 'lxml')
-                fav, ep, al, tags = self._extract_stats_and_tags(soup)
+    def __exit__(self, *exc):
+        self.close()
 
-                if fav < 10 or ep < 1:
-                    self.db.add_to_blacklist(novel_id, "LOW_SIGNAL")
-                    return "BLACKLISTED (Insufficient Data)"
+    def refresh_classifier(self):
+        """Switches to the vault's active rule set if reclassify_adult() changed it (one PK lookup)."""
+        if self._pinned_classifier:
+            return self.classifier
+        version = self.db.get_adult_ruleset()
+        if version != self.classifier.version:
+            self.classifier = get_classifier(version)
+        return self.classifier
 
-                # --- 18+ LOGIC OVERRIDE ---
-                is_18 = 1 if "19세" in resp.text else 0
-                
-                # Check tags for adult content (case-insensitive for ntl/ntr)
-                tag_list = [t.lower() for t in tags.split(',')]
-                if any(flag in tag_list for flag in self.ADULT_RED_FLAGS):
-                    is_18 = 1
-                # --------------------------
+    def parse(self, novel_id, url, status_code, text):
+        return parse_novel(novel_id, url, status_code, text, self.classifier, self.fast_parse)
 
-                title_meta = soup.find("meta", property="og:title")
-                title = title_meta.get("content", "Unknown").replace("노벨피아 - ", "").split(" - ")[0] if title_meta else f"Novel_{novel_id}"
+    def persist(self, novel_id, verdict, record, sink=None):
+        """Writes a parse verdict to the sink (DB by default) and returns the result string."""
+        sink = sink or self.db
+        if verdict == "404":
+            sink.add_to_blacklist(novel_id, "404")
+            return "BLACKLISTED (404)"
+        if verdict == "LOW_SIGNAL":
+            sink.add_to_blacklist(novel_id, "LOW_SIGNAL")
+            return "BLACKLISTED (Insufficient Data)"
 
-                data = {
-                    'id': novel_id,
-                    'title': title,
-                    'author': "NPIA Scout",
-                    'fav': fav,
-                    'ep': ep,
-                    'al': al,
-                    'ratio': round(fav / ep, 2) if ep > 0 else 0,
-                    'tags': tags,
-                    'is_19': is_18,
-                    'is_plus': 1 if "플러스" in resp.text or "plus" in resp.text.lower() else 0,
-                    'url': url,
-                    'date': datetime.now()
-                }
+        data = dict(record, date=datetime.now())
+        sink.save_novel(data)
+        return f"SUCCESS (18+: {'YES' if data['is_19'] else 'NO'} | Ratio: {data['ratio']})"
 
-                self.db.save_novel(data)
-                return f"SUCCESS (18+: {'YES' if is_18 else 'NO'} | Ratio: {data['ratio']})"
+    def process_response(self, novel_id, url, status_code, text, sink=None):
+        """
+        Classifies a fetched page and persists it (scrape_novel; ScanEngine runs
+        parse and persist as separate stages). sink defaults to the DB; a BatchWriter can be passed to buffer writes.
+        """
+        verdict, record = self.parse(novel_id, url, status_code, text)
+        return self.persist(novel_id, verdict, record, sink)
 
+    def scrape_novel(self, novel_id):
+        if self.db.check_exists(novel_id):
+            return "SKIPPED (Existing)"
+        self.refresh_classifier()
+
+        url = f"{self.base_url}{novel_id}"
+        try:
+            resp = self.client.get(url)
+            if is_transient_status(resp.status_code):
+                # Throttled or server trouble: not evidence the novel is missing
+                return f"ERR: HTTP {resp.status_code}"
+            return self.process_response(novel_id, url, resp.status_code, resp.text)
         except Exception as e:
             return f"ERR: {str(e)[:20]}"
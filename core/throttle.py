@@ -0,0 +1,170 @@
+import asyncio
+import random
+import time
+from collections import deque
+
+import httpx
+
+# Worth retrying: the server is throttling us or having a bad moment
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.TransportError)
+
+
+def is_transient_status(status_code):
+    return status_code in RETRY_STATUSES or status_code >= 500
+
+
+def retry_after_seconds(resp):
+    """Parses a numeric Retry-After header; HTTP-date values are ignored."""
+    try:
+        return max(float(resp.headers.get("Retry-After", "")), 0.0)
+    except ValueError:
+        return None
+
+
+class AdaptiveRateLimiter:
+    """
+    AIMD request pacer for a single host. Every success nudges the rate up by
+    `increase` req/s (capped at `max_rate`); a 429, or latency above
+    `latency_target`, cuts it multiplicatively. rate=0 disables pacing entirely.
+    """
+
+    def __init__(self, rate, max_rate=None, min_rate=0.5, increase=0.1, backoff=0.5,
+                 latency_target=None, cut_window=1.0):
+        self.rate = float(rate)
+        self.max_rate = float(max_rate or rate)
+        self.min_rate = min(min_rate, self.rate) if self.rate else 0.0
+        self.increase = increase
+        self.backoff = backoff
+        self.latency_target = latency_target
+        self.cut_window = cut_window
+        self.throttled = 0
+        self._next_slot = 0.0
+        self._last_cut = 0.0
+        self._lock = asyncio.Lock()
+
+    async def wait(self):
+        if not self.rate:
+            return
+        async with self._lock:
+            now = time.monotonic()
+            delay = self._next_slot - now
+            self._next_slot = max(now, self._next_slot) + 1.0 / self.rate
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def on_success(self, latency):
+        if not self.rate:
+            return
+        if self.latency_target and latency > self.latency_target:
+            self._cut(0.9)
+        else:
+            self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_throttle(self, retry_after=None):
+        self.throttled += 1
+        if retry_after:
+            # Honour the server's pause for everyone, not just the retried ID
+            self._next_slot = max(self._next_slot, time.monotonic() + retry_after)
+        self._cut(self.backoff)
+
+    def _cut(self, factor):
+        if not self.rate:
+            return
+        now = time.monotonic()
+        # One decrease per window, so a burst of 429s doesn't collapse the rate
+        if now - self._last_cut < self.cut_window:
+            return
+        self._last_cut = now
+        self.rate = max(self.min_rate, self.rate * factor)
+
+
+class RetryScheduler:
+    """Per-ID attempt tracking with capped exponential backoff and full jitter."""
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=60.0, rng=None):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+        self.attempts = {}
+        self.last_error = {}
+        self.retried = 0
+        self.gave_up = 0
+
+    def next_delay(self, key, error, retry_after=None):
+        """Seconds to wait before retrying `key`, or None once its attempts are used up."""
+        n = self.attempts.get(key, 0) + 1
+        self.attempts[key] = n
+        self.last_error[key] = error
+        if n >= self.max_attempts:
+            self.gave_up += 1
+            return None
+        self.retried += 1
+        delay = self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (n - 1)))
+        return max(delay, retry_after or 0.0)
+
+    def done(self, key):
+        self.attempts.pop(key, None)
+        self.last_error.pop(key, None)
+
+
+class CircuitBreaker:
+    """
+    Opens when at least `failure_ratio` of the last `window` requests failed,
+    pausing all fetchers for `cooldown` seconds (doubling on each consecutive
+    trip). After the cooldown a single probe request decides whether to close
+    again. `exhausted` flips once `max_trips` trips happen without a recovery.
+    """
+
+    def __init__(self, failure_ratio=0.5, window=20, cooldown=30.0, max_trips=3):
+        self.failure_ratio = failure_ratio
+        self.window = window
+        self.cooldown = cooldown
+        self.max_trips = max_trips
+        self.state = "closed"
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+
+    @property
+    def exhausted(self):
+        return self.trips >= self.max_trips
+
+    def _open(self):
+        self.state = "open"
+        self.trips += 1
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._outcomes.clear()
+
+    def record(self, ok):
+        if self.state == "open":
+            return  # stragglers from before the trip
+        if self.state == "half_open":
+            if ok:
+                self.state, self.trips, self._probing = "closed", 0, False
+            else:
+                self._open()
+            return
+        self._outcomes.append(ok)
+        failures = self._outcomes.count(False)
+        if len(self._outcomes) == self.window and failures / self.window >= self.failure_ratio:
+            self._open()
+
+    async def wait(self):
+        """Blocks while the breaker is open; lets exactly one probe through when half-open."""
+        while True:
+            if self.state == "closed" or self.exhausted:
+                return
+            if self.state == "open":
+                remaining = self._opened_at + self.cooldown * 2 ** (self.trips - 1) - time.monotonic()
+                if remaining > 0:
+                    await asyncio.sleep(remaining)
+                    continue
+                self.state = "half_open"
+            if not self._probing:
+                self._probing = True
+                return
+            await asyncio.sleep(min(1.0, self.cooldown))
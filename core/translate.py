@@ -0,0 +1,125 @@
+"""
+Machine translation for missing tags: cached in SQLite, sent in chunks over a
+few concurrent requests, with swappable backends so the audit tab works (and
+can be exercised) without Google.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Optional offline glossary (flat {korean: english} JSON) for the dictionary backend
+GLOSSARY_PATH = Path(__file__).resolve().parent.parent / "data" / "glossary.json"
+
+
+class GoogleBackend:
+    """
+    deep_translator's GoogleTranslator, one request per chunk: tags are joined
+    with newlines and the reply split back apart. If the line count doesn't
+    survive the round trip, the chunk falls back to one request per tag.
+    """
+    name = "google"
+    cacheable = True
+    max_chars = 4500  # Google rejects payloads over 5000 characters
+
+    def __init__(self, source='ko', target='en'):
+        from deep_translator import GoogleTranslator
+        self.translator = GoogleTranslator(source=source, target=target)
+
+    def translate_batch(self, texts):
+        reply = self.translator.translate("\n".join(texts)) or ""
+        lines = [line.strip() for line in reply.split("\n")]
+        if len(lines) == len(texts):
+            return lines
+        return [self.translator.translate(t) for t in texts]
+
+
+class DictionaryBackend:
+    """Offline lookups from a dict and/or a flat JSON file; unknown tags come back as None."""
+    name = "dictionary"
+    cacheable = True
+
+    def __init__(self, mapping=None, path=GLOSSARY_PATH):
+        self.mapping = dict(mapping or {})
+        if path and Path(path).exists():
+            with open(path, encoding="utf-8") as f:
+                self.mapping.update(json.load(f))
+
+    def translate_batch(self, texts):
+        return [self.mapping.get(t) for t in texts]
+
+
+class StubBackend:
+    """Deterministic fake for tests and dry runs: echoes each tag through `template`."""
+    name = "stub"
+    cacheable = False  # fake output must never pass for a real translation
+
+    def __init__(self, template="[{}]"):
+        self.template = template
+        self.calls = 0
+
+    def translate_batch(self, texts):
+        self.calls += 1
+        return [self.template.format(t) for t in texts]
+
+
+BACKENDS = {"google": GoogleBackend, "dictionary": DictionaryBackend, "stub": StubBackend}
+# What the dashboard offers; the stub stays available to scripts and tests only
+UI_BACKENDS = [name for name, cls in BACKENDS.items() if cls.cacheable]
+
+
+def get_backend(name, **kwargs):
+    return BACKENDS[name](**kwargs)
+
+
+class BatchTranslator:
+    """
+    Translates tags at most once per backend: hits come from the translation
+    cache table, misses are chunked (chunk_size tags per request) and sent
+    `concurrency` requests at a time. Failed chunks are skipped, not cached,
+    so they are retried on the next call. Backends with cacheable = False
+    bypass the cache entirely.
+    """
+
+    def __init__(self, db, backend, chunk_size=50, concurrency=4):
+        self.db = db
+        self.backend = backend
+        self.chunk_size = chunk_size
+        self.concurrency = concurrency
+        self.failed = []
+
+    def _chunks(self, tags):
+        chunk, size = [], 0
+        limit = getattr(self.backend, "max_chars", None)
+        for tag in tags:
+            if chunk and (len(chunk) >= self.chunk_size or (limit and size + len(tag) + 1 > limit)):
+                yield chunk
+                chunk, size = [], 0
+            chunk.append(tag)
+            size += len(tag) + 1
+        if chunk:
+            yield chunk
+
+    def _translate_chunk(self, chunk):
+        try:
+            return self.backend.translate_batch(chunk)
+        except Exception as e:
+            print(f"Translation Error ({self.backend.name}, {len(chunk)} tags): {e}")
+            self.failed.extend(chunk)
+            return [None] * len(chunk)
+
+    def translate(self, tags):
+        """{tag: english} for every tag the cache or the backend could translate."""
+        tags = list(dict.fromkeys(t for t in tags if t))
+        cacheable = getattr(self.backend, "cacheable", True)
+        cached = self.db.get_cached_translations(tags, self.backend.name) if cacheable else {}
+        todo = [t for t in tags if t not in cached]
+        self.failed = []
+        fresh = {}
+        if todo:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+                chunks = list(self._chunks(todo))
+                for chunk, result in zip(chunks, pool.map(self._translate_chunk, chunks)):
+                    fresh.update({t: e.strip() for t, e in zip(chunk, result) if e and e.strip()})
+            if cacheable:
+                self.db.cache_translations(fresh, self.backend.name)
+        return {**cached, **fresh}
@@ -0,0 +1,160 @@
+import atexit
+import queue
+import threading
+import time
+from datetime import datetime
+
+
+class BatchWriter:
+    """
+    Buffers save_novel / add_to_blacklist calls and flushes them to NovelDB in
+    executemany transactions, either every `batch_size` rows or every
+    `flush_interval` seconds, whichever comes first.
+    Drop-in sink for NovelpiaScraper: same method names as NovelDB.
+
+    A failed write is retried `retries` times with backoff; if it still fails the
+    rows stay buffered for the next flush, and flush()/close() raise instead of
+    reporting them as written.
+    """
+
+    def __init__(self, db, batch_size=200, flush_interval=1.0, retries=3, retry_delay=0.5):
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retries = retries
+        self.retry_delay = retry_delay
+
+        self._queue = queue.Queue()
+        self._closed = False
+        self._lock = threading.Lock()
+
+        self.rows_written = 0
+        self.flushes = 0
+        self.errors = 0
+        self.unwritten = 0  # rows held back by a failing write
+        self.last_error = None
+        self._started_at = time.monotonic()
+
+        self._thread = threading.Thread(target=self._run, name="npia-batch-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- Sink API (mirrors NovelDB) ---
+    def save_novel(self, data):
+        self._put(("novel", data))
+
+    def add_to_blacklist(self, novel_id, reason):
+        self._put(("blacklist", (novel_id, reason, datetime.now())))
+
+    def _put(self, item):
+        # Under the lock so nothing can be queued behind close()'s stop marker
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("BatchWriter is closed")
+            self._queue.put(item)
+
+    # --- Lifecycle ---
+    def flush(self):
+        """Blocks until everything queued so far is committed; raises if the write failed."""
+        done, failed = threading.Event(), []
+        with self._lock:
+            if not self._closed:
+                self._queue.put(("flush", (done, failed)))
+        if self._closed:
+            # close() already wrote whatever could be written
+            self._thread.join()
+            self._raise_if_unwritten()
+            return
+        done.wait()
+        if failed:
+            raise RuntimeError(f"Batch write failed, {self.unwritten} rows pending: {failed[0]}")
+
+    def close(self):
+        """Writes what's left and stops; raises if rows could not be written."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(("stop", None))
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._raise_if_unwritten()
+
+    def _raise_if_unwritten(self):
+        if self.unwritten:
+            raise RuntimeError(f"Batch write failed, {self.unwritten} rows not written: {self.last_error}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def stats(self):
+        elapsed = max(time.monotonic() - self._started_at, 1e-9)
+        return {
+            "rows_written": self.rows_written,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "unwritten": self.unwritten,
+            "pending": self._queue.qsize(),
+            "rows_per_sec": round(self.rows_written / elapsed, 1),
+        }
+
+    # --- Background flusher ---
+    def _run(self):
+        novels, blacklist, waiters = [], [], []
+        deadline = time.monotonic() + self.flush_interval
+        stopping = False
+
+        while not stopping:
+            timeout = max(deadline - time.monotonic(), 0)
+            try:
+                kind, payload = self._queue.get(timeout=timeout)
+                if kind == "novel":
+                    novels.append(payload)
+                elif kind == "blacklist":
+                    blacklist.append(payload)
+                elif kind == "flush":
+                    waiters.append(payload)
+                elif kind == "stop":
+                    stopping = True
+            except queue.Empty:
+                pass
+
+            due = time.monotonic() >= deadline
+            if due or waiters or stopping or len(novels) + len(blacklist) >= self.batch_size:
+                # Rows a failed write couldn't commit stay buffered for the next flush
+                error = self._write(novels, blacklist)
+                self.unwritten = len(novels) + len(blacklist)
+                for done, failed in waiters:
+                    if error is not None:
+                        failed.append(error)
+                    done.set()
+                waiters = []
+                deadline = time.monotonic() + self.flush_interval
+
+    def _write(self, novels, blacklist):
+        """Commits the batch, retrying with backoff. Returns the last error, or None."""
+        if not novels and not blacklist:
+            return None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(self.retry_delay * 2 ** (attempt - 1))
+            try:
+                # Each list is emptied once committed, so a retry only resends what failed
+                if novels:
+                    self.db.save_novels(novels)
+                    self.rows_written += len(novels)
+                    novels.clear()
+                if blacklist:
+                    self.db.add_many_to_blacklist(blacklist)
+                    self.rows_written += len(blacklist)
+                    blacklist.clear()
+                self.flushes += 1
+                return None
+            except Exception as e:
+                self.errors += 1
+                self.last_error = e
+                print(f"Batch Write Error (attempt {attempt + 1}/{self.retries + 1}): {e}")
+        return self.last_error
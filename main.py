@@ -3,13 +3,57 @@ import pandas as pd
 import plotly.express as px
 from core.database import NovelDB
 from core.scraper import NovelpiaScraper
-from core.mappings import translate_tags, TAG_MAP
-from deep_translator import GoogleTranslator
+from core.scanner import ScanEngine
+from core.jobs import JobRunner
+from core.refresh import RefreshPlanner
+from core.scoring import DEFAULT_WEIGHTS, VaultScorer
+from core.mappings import translate_tag_counts, TAGS
+from core.translate import UI_BACKENDS, BatchTranslator, get_backend
 
 # --- SETUP ---
 st.set_page_config(page_title="Sleeper Scout 2026", layout="wide", page_icon="🎯")
-db = NovelDB()
-scraper = NovelpiaScraper(db)
+
+@st.cache_resource
+def get_db():
+    return NovelDB()
+
+@st.cache_resource
+def get_scraper():
+    # One pooled HTTP client shared across reruns and sessions
+    return NovelpiaScraper(get_db())
+
+@st.cache_resource
+def get_scorer():
+    # Holds the scored vault between reruns; rebuilt only when the data version moves
+    return VaultScorer(get_db())
+
+@st.cache_resource
+def get_job_runner():
+    # Process-wide: background jobs outlive the session that launched them
+    return JobRunner(get_scraper())
+
+db = get_db()
+scraper = get_scraper()
+jobs = get_job_runner()
+# Picks up tag_map.json edits made by another session or by hand
+db.sync_tag_translations()
+
+# `version` is only a cache key: the DB bumps it whenever valid_novels changes,
+# so reruns with unchanged data and the same filters never touch SQLite.
+@st.cache_data(max_entries=64)
+def load_vault_page(version, plus_only, adult_only, sort, page_size, page, growth_days):
+    return pd.DataFrame(db.query_vault(plus_only, adult_only, sort, limit=page_size,
+                                       offset=page * page_size, growth_days=growth_days))
+
+@st.cache_data(max_entries=16)
+def count_vault(version, plus_only, adult_only):
+    return db.count_vault(plus_only, adult_only)
+
+@st.cache_data(max_entries=64)
+def search_vault(version, query, plus_only, adult_only, limit=200):
+    return pd.DataFrame(db.search_vault(query, limit, plus_only, adult_only))
+
+VAULT_SORTS = {"Ratio": "ratio", "Fav Growth / Day": "growth", "Favorites": "fav", "Newest": "newest"}
 
 # --- SIDEBAR ---
 with st.sidebar:
@@ -17,51 +61,134 @@ with st.sidebar:
     col_s, col_e = st.columns(2)
     start_id = col_s.number_input("Start ID", value=383000)
     end_id = col_e.number_input("End ID", value=383100)
+    col_c, col_r = st.columns(2)
+    concurrency = col_c.number_input("Concurrency", value=16, min_value=1, max_value=128)
+    rate_limit = col_r.number_input("Req/sec", value=8.0, min_value=0.5, step=0.5)
+    parse_procs = st.number_input("Parse Processes", value=0, min_value=0, max_value=32,
+                                  help="0 parses on the scan loop; more spreads parsing across CPU cores.")
+    run_background = st.checkbox("Run as background job", value=False,
+                                 help="Checkpointed to the DB; survives refreshes and can be resumed.")
     
-    if st.button("🚀 Launch Scout Mission", use_container_width=True):
+    launched = st.button("🚀 Launch Scout Mission", use_container_width=True)
+    if launched and run_background:
+        job_id = jobs.submit(int(start_id), int(end_id), int(concurrency), float(rate_limit))
+        st.toast(f"Job #{job_id} launched. Track it in the Scan Jobs tab.")
+    elif launched:
         progress_bar = st.progress(0)
-        total_tasks = int(end_id - start_id + 1)
-        for i, nid in enumerate(range(int(start_id), int(end_id) + 1)):
-            scraper.scrape_novel(str(nid))
-            progress_bar.progress((i + 1) / total_tasks)
-        st.success("Mission completed.")
+        engine = ScanEngine(scraper, concurrency=int(concurrency), rate_limit=float(rate_limit),
+                            parse_processes=int(parse_procs))
+        engine.run(
+            range(int(start_id), int(end_id) + 1),
+            on_progress=lambda done, total, nid, res: progress_bar.progress(done / total),
+        )
+        if engine.aborted:
+            st.error(f"Mission aborted: {engine.aborted}.")
+        else:
+            st.success("Mission completed.")
+        with st.expander("Pipeline Stats"):
+            st.json(engine.stats())
+
+    refresh_budget = st.number_input("Refresh Budget", value=200, min_value=10, step=50,
+                                     help="Max re-scrapes, spent on the stalest fast-growing novels first.")
+    if st.button("♻️ Refresh Stale Novels", use_container_width=True):
+        refresh_ids = RefreshPlanner(db, budget=int(refresh_budget)).plan()
+        if refresh_ids:
+            progress_bar = st.progress(0)
+            engine = ScanEngine(scraper, concurrency=int(concurrency), rate_limit=float(rate_limit))
+            engine.run(refresh_ids, skip_known=False,
+                       on_progress=lambda done, total, nid, res: progress_bar.progress(done / total))
+            st.success(f"Refreshed {len(refresh_ids)} novels.")
+        else:
+            st.info("Nothing is stale enough to refresh.")
 
     st.divider()
     f_plus = st.checkbox("Plus Only", value=False)
     f_19 = st.checkbox("18+ Only", value=False)
+    sort_by = st.selectbox("Sort Vault By", list(VAULT_SORTS))
+    growth_days = st.slider("Growth Window (days)", 1, 60, 7) if sort_by == "Fav Growth / Day" else 7
+    due = sum(d for _, d in db.get_blacklist_summary().values())
+    if st.button(f"🔁 Re-probe Blacklist ({due} due)", help="LOW_SIGNAL IDs come due after 7 days, 404s after 30."):
+        reprobe_ids = db.get_reprobe_ids()
+        if reprobe_ids:
+            progress_bar = st.progress(0)
+            ScanEngine(scraper, concurrency=int(concurrency), rate_limit=float(rate_limit)).run(
+                reprobe_ids, on_progress=lambda done, total, nid, res: progress_bar.progress(done / total))
+            st.toast(f"Re-probed {len(reprobe_ids)} blacklisted IDs.")
     if st.button("🗑️ Purge Blacklist"):
         db.clear_blacklist()
         st.toast("Blacklist wiped.")
 
+# Read once per rerun; both the Market Share and Audit tabs share it
+tag_counts = db.get_tag_stats()
+
 # --- TABS ---
-tab_vault, tab_tags, tab_audit, tab_surgical = st.tabs([
-    "📂 Intelligence Vault", "📊 Market Share", "📥 Translation Audit", "🔬 Surgical Entry"
+tab_vault, tab_rank, tab_tags, tab_audit, tab_surgical, tab_jobs = st.tabs([
+    "📂 Intelligence Vault", "🏆 Sleeper Ranking", "📊 Market Share", "📥 Translation Audit",
+    "🔬 Surgical Entry", "🛰️ Scan Jobs"
 ])
 
 # --- TAB 1: VAULT ---
 with tab_vault:
-    df = pd.read_sql("SELECT * FROM valid_novels", db.get_connection())
+    version = db.get_data_version()
+    query = st.text_input("🔎 Search titles & tags", placeholder="e.g. 독점 무역, 현판, Modern Fantasy").strip()
+    if query:
+        # Ranked best match first; sorting and paging don't apply
+        df = search_vault(version, query, f_plus, f_19)
+        st.caption(f"{len(df):,} matches for “{query}”" + (" (top 200)" if len(df) == 200 else ""))
+    else:
+        total_rows = count_vault(version, f_plus, f_19)
+        c1, c2 = st.columns([1, 1])
+        page_size = c1.selectbox("Rows per page", [50, 100, 250, 500], index=1)
+        n_pages = max(1, -(-total_rows // page_size))
+        page = c2.number_input(f"Page (of {n_pages})", min_value=1, max_value=n_pages, value=1) - 1
+        df = load_vault_page(version, f_plus, f_19, VAULT_SORTS[sort_by], page_size, int(page), growth_days)
+        if not df.empty:
+            st.caption(f"{total_rows:,} novels match · showing {page * page_size + 1:,}–{page * page_size + len(df):,}")
     if not df.empty:
-        df['tags_en'] = df['tags'].apply(translate_tags)
-        if f_plus: df = df[df['is_plus'] == 1]
-        if f_19: df = df[df['is_19'] == 1]
 
         def highlight_18(row):
             return ['background-color: rgba(255, 75, 75, 0.15)'] * len(row) if row.is_19 == 1 else [''] * len(row)
 
         st.dataframe(
-            df.sort_values(by="ratio", ascending=False).style.apply(highlight_18, axis=1),
-            column_config={"url": st.column_config.LinkColumn("Access"), "ratio": st.column_config.NumberColumn("Ratio", format="%.2f ⭐")},
-            column_order=("novel_id", "title", "ratio", "fav", "ep", "tags_en", "is_19", "is_plus", "url"),
+            df.style.apply(highlight_18, axis=1),
+            column_config={"url": st.column_config.LinkColumn("Access"), "ratio": st.column_config.NumberColumn("Ratio", format="%.2f ⭐"),
+                           "growth": st.column_config.NumberColumn("Favs/Day", format="%.1f 📈")},
+            column_order=("novel_id", "title", "ratio", "growth", "fav", "ep", "tags_en", "is_19", "is_plus", "url"),
             use_container_width=True, hide_index=True
         )
 
-# --- TAB 2: MARKET SHARE ---
+# --- TAB 2: SLEEPER RANKING ---
+with tab_rank:
+    st.caption("Weighted mean of percentile scores. Moving a slider re-ranks the cached vault instantly.")
+    cols = st.columns(5)
+    weights = {
+        "ratio": cols[0].slider("Fav/Ep Ratio", 0.0, 3.0, DEFAULT_WEIGHTS["ratio"], 0.1),
+        "alarm": cols[1].slider("Alarm Density", 0.0, 3.0, DEFAULT_WEIGHTS["alarm"], 0.1),
+        "growth": cols[2].slider("Fav Growth", 0.0, 3.0, DEFAULT_WEIGHTS["growth"], 0.1),
+        "quality": cols[3].slider("ID-Age Quality Bar", 0.0, 3.0, DEFAULT_WEIGHTS["quality"], 0.1,
+                                  help="Judged on views, so it only applies to novels with a view count."),
+    }
+    top_n = cols[4].number_input("Top N", value=100, min_value=10, max_value=5000, step=50)
+    ranked = get_scorer().rank(weights, top=int(top_n), plus_only=f_plus, adult_only=f_19, growth_days=growth_days)
+    if not ranked.empty:
+        st.dataframe(
+            ranked,
+            column_config={"url": st.column_config.LinkColumn("Access"),
+                           "score": st.column_config.ProgressColumn("Score", min_value=0.0, max_value=1.0, format="%.3f"),
+                           "ratio_raw": st.column_config.NumberColumn("Fav/Ep", format="%.2f"),
+                           "alarm_raw": st.column_config.NumberColumn("Al/Ep", format="%.2f"),
+                           "growth_raw": st.column_config.NumberColumn("Favs/Day", format="%.1f")},
+            column_order=("novel_id", "title", "score", "ratio_raw", "alarm_raw", "growth_raw", "quality",
+                          "fav", "ep", "tags_en", "is_19", "url"),
+            use_container_width=True, hide_index=True
+        )
+    else:
+        st.info("Nothing to rank yet.")
+
+# --- TAB 3: MARKET SHARE ---
 with tab_tags:
-    tag_counts = db.get_tag_stats()
     if tag_counts:
-        translated = {TAG_MAP.get(k, f"[!] {k}"): v for k, v in tag_counts.items()}
-        tag_df = pd.DataFrame(translated.items(), columns=['Tag', 'Freq']).sort_values('Freq', ascending=False)
+        tag_df = translate_tag_counts(tag_counts, missing="[!] {}")
         c1, c2 = st.columns([3, 2])
         with c1:
             fig = px.pie(tag_df.head(10), values='Freq', names='Tag', hole=0.4, title="Top 10 Tropes")
@@ -70,44 +197,71 @@ with tab_tags:
         with c2:
             st.dataframe(tag_df, use_container_width=True, hide_index=True)
 
-# --- TAB 3: TRANSLATION AUDIT (AUTOMATED) ---
+# --- TAB 4: TRANSLATION AUDIT (AUTOMATED) ---
 with tab_audit:
     st.subheader("🔍 Automatic Trope Mapping")
-    tag_counts = db.get_tag_stats()
     
     if tag_counts:
-        missing_tags = [k for k in tag_counts.keys() if k not in TAG_MAP]
+        missing_tags = [k for k in tag_counts.keys() if k not in TAGS]
         
         if missing_tags:
             st.warning(f"Detected {len(missing_tags)} tags missing English translations.")
             
-            if st.button("🪄 Magic Translate (Auto-suggest English)"):
+            c1, c2 = st.columns([1, 3])
+            backend_name = c1.selectbox("Backend", UI_BACKENDS)
+            if c2.button("🪄 Magic Translate (Auto-suggest English)"):
                 with st.spinner("Translating tropes..."):
-                    translator = GoogleTranslator(source='ko', target='en')
-                    # Batch processing to prevent timeout
-                    suggestions = {}
-                    for tag in missing_tags:
-                        try:
-                            # Handle common slang/tropes manually if needed, otherwise use Google
-                            suggestions[tag] = translator.translate(tag)
-                        except:
-                            suggestions[tag] = "Translation Error"
-                    
-                    # Create the code block for mappings.py
-                    code_lines = [f'    "{k}": "{v}",' for k, v in suggestions.items()]
-                    st.success("Translations generated! Copy the block below into your TAG_MAP:")
-                    st.code("\n".join(code_lines), language='python')
+                    try:
+                        backend = get_backend(backend_name)
+                    except ImportError as e:
+                        st.error(f"Backend unavailable: {e}")
+                    else:
+                        # Cached per backend in SQLite; only never-seen tags hit the network
+                        translator = BatchTranslator(db, backend)
+                        st.session_state['tag_suggestions'] = translator.translate(missing_tags)
+                        if translator.failed:
+                            st.warning(f"{len(translator.failed)} tags failed to translate; they'll be retried next time.")
             
-            # Simple list view
-            m_df = pd.DataFrame([{"Korean": k, "Count": tag_counts[k]} for k in missing_tags]).sort_values("Count", ascending=False)
-            st.dataframe(m_df, use_container_width=True)
+            # Review/edit suggestions (or type your own), then save straight into tag_map.json
+            suggestions = st.session_state.get('tag_suggestions', {})
+            m_df = pd.DataFrame([{"Korean": k, "Count": tag_counts[k], "English": suggestions.get(k, "")}
+                                 for k in missing_tags]).sort_values("Count", ascending=False)
+            edited = st.data_editor(m_df, disabled=["Korean", "Count"], use_container_width=True, hide_index=True)
+            if st.button("💾 Save Translations"):
+                saved = TAGS.update(dict(zip(edited["Korean"], edited["English"])))
+                db.sync_tag_translations()
+                st.session_state.pop('tag_suggestions', None)
+                st.toast(f"Saved {saved} translations to tag_map.json.")
+                st.rerun()
         else:
-            st.success("All tags are currently translated in mappings.py!")
+            st.success("All tags are currently translated in the tag dictionary!")
     else:
         st.info("No data available to audit.")
 
-# --- TAB 4: SURGICAL ENTRY ---
+# --- TAB 5: SURGICAL ENTRY ---
 with tab_surgical:
     target_id = st.text_input("Target Novel ID")
     if st.button("Surgical Scout"):
         st.code(scraper.scrape_novel(target_id))
+
+# --- TAB 6: SCAN JOBS ---
+with tab_jobs:
+    st.button("🔄 Refresh")
+    job_rows = db.list_scan_jobs()
+    if job_rows:
+        for job in job_rows:
+            span = job['end_id'] - job['start_id'] + 1
+            scanned = job['cursor'] - job['start_id'] + 1
+            c1, c2, c3, c4 = st.columns([4, 1, 1, 1])
+            c1.progress(min(scanned / span, 1.0),
+                        text=f"#{job['job_id']} · {job['start_id']}–{job['end_id']} · {job['status']}"
+                             f" · {job['failed'] or 0} failed" + (f" · {job['error']}" if job['error'] else ""))
+            running = jobs.is_running(job['job_id'])
+            if running and c2.button("⏹ Stop", key=f"stop_{job['job_id']}"):
+                jobs.stop(job['job_id'])
+            if not running and scanned < span and c3.button("▶ Resume", key=f"resume_{job['job_id']}"):
+                jobs.resume(job['job_id'])
+            if not running and job['failed'] and c4.button("🔁 Retry Failed", key=f"retry_{job['job_id']}"):
+                jobs.retry_failed(job['job_id'])
+    else:
+        st.info("No scan jobs yet. Tick 'Run as background job' in the sidebar to launch one.")